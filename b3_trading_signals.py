@@ -1,47 +1,77 @@
-import os, itertools, sys, traceback
+import os, sys, traceback
+from concurrent.futures import ProcessPoolExecutor
+from core.config import Config
 from core.loader import Loader
-from core.indicator import Indicator
+from core.indicator import Indicator, IndicatorCache
 from core.backtester import Backtester
-from core.forecaster import Forecaster
+from core.grid import GridBacktester
+from core.incremental import IncrementalBacktester
+from core.intraday import IntradayBacktester
+from core.search import ParameterSearch
+from core.walkforward import WalkForward
+from core.forecaster import ForecastCache, ModelRegistry
 from core.strategies import Strategies
 from core.exporter import Exporter
+from core.renderer import Renderer
+from core.profiler import Profiler
+from core.framestore import FrameStore
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 
-def main():
-    loader = Loader("config.json", "tickers.txt", "indicators.txt")
+def process_frame(ticker, df, indicator, cache, forecasts, config, profiler=None):
+    profiler = profiler or Profiler(config, enabled=False)
+    combo    = f"{indicator['ind_t']}_{'_'.join(str(p) for p in indicator['ind_p'])}"
 
-    # initialize cache dictionaries
-    raw_data = {}
-    pro_data = {}
-    res_data = {}
+    # setup indicator
+    with profiler.stage("indicator", ticker, combo):
+        df = Indicator(indicator, cache).setup_indicator(df)
 
-    # import lists
-    tickers    = loader.load_tickers()
-    indicators = loader.load_indicators()
+    # predictions (model trained once per ticker)
+    with profiler.stage("forecast", ticker, combo):
+        df["Predicted_Close"] = forecasts.get(ticker, df).df["Predicted_Close"]
 
-    try:
-        # download data and run backtest (for each ticker and strategy)
-        for ticker, indicator in itertools.product(tickers, indicators):
-
-            # download data (only once)
-            if ticker not in raw_data:
-                raw_data[ticker] = loader.download_data(ticker)
-            df = raw_data[ticker]
-
-            # setup indicator
-            df = Indicator(indicator).setup_indicator(df)
-
-            # predictions
-            df = Forecaster(df).predictions()
-            
-            # run backtest
-            backtest = Backtester(df)
-            df = backtest.run_strategy(indicator)
-            
-            if ticker not in res_data:
-                res_data[ticker] = {}
-                pro_data[ticker] = {}
+    # run backtest
+    with profiler.stage("backtest", ticker, combo):
+        return Backtester(df, config, cache).run_strategy(indicator)
+
+
+def run_ticker(ticker, df, indicators, config):
+    """
+    Runs indicators, predictions and backtest of every strategy of one ticker.
+    Processed data is exported here, so only compact results
+    (res_data of the ticker, cache counters and stage timings) are returned.
+    """
+    res_data = {}
+    pro_data = FrameStore(ticker, config)
+    cache    = IndicatorCache()
+    exporter = Exporter(config)
+    profiler = Profiler(config)
+
+    # forecast models (trained once per ticker)
+    forecasts = ForecastCache(file_config=config)
+
+    engine   = config.section("backtest").get("engine", "frame")
+    intraday = config.section("intraday").get("enabled", False)
+    if intraday:
+        # run backtest over the bar store in chunks (state carried across chunks and runs)
+        with profiler.stage("backtest", ticker):
+            res_data = IntradayBacktester(ticker, indicators, config).run()
+    elif config.section("search").get("enabled", False):
+        # search the parameter space (indicators are the specs of search.txt)
+        with profiler.stage("search", ticker):
+            res_data = ParameterSearch(df, config, cache).run(ticker, indicators)
+    elif engine == "grid":
+        # run backtest (all strategies in one pass)
+        with profiler.stage("backtest", ticker):
+            res_data = GridBacktester(df, config, cache).run(ticker, indicators)
+    elif engine == "incremental":
+        # run backtest (only bars after the previous run, state kept in data/state)
+        with profiler.stage("backtest", ticker):
+            res_data = IncrementalBacktester(ticker, indicators, config).run(df)
+    else:
+        # run backtest (for each strategy)
+        for indicator in indicators:
+            df_i = process_frame(ticker, df, indicator, cache, forecasts, config, profiler)
 
             # store processed data and result data
             ind_t  = indicator["ind_t"]  # indicator title
@@ -49,34 +79,155 @@ def main():
             params = "_".join(str(p) for p in ind_p)
             label  = f"{ticker}_{ind_t}_{params}"
         
-            pro_data[ticker][label] = df.copy()
-            res_data[ticker][label] = {
+            if exporter.format == "excel":
+                pro_data.put(label, df_i)
+            else:
+                with profiler.stage("export_frame", ticker, label.removeprefix(f"{ticker}_")):
+                    exporter.write_frame(ticker, label, pro_data.compact(df_i))
+            res_data[label] = {
                 "Indicator": ind_t,
                 "Parameters": ind_p,
-                "Return_Market": df["Cumulative_Market"].iloc[-1],
-                "Return_Strategy": df["Cumulative_Strategy"].iloc[-1],
-                "Trades": df["Cumulative_Trades"].iloc[-1]//2,
-                "Sharpe": df["Strategy"].mean()/df["Strategy"].std()*pow(len(df["Strategy"]), 0.5),
-                "Max_Drawdown": abs(df["Drawdown"].min()),
+                "Return_Market": df_i["Cumulative_Market"].iloc[-1],
+                "Return_Strategy": df_i["Cumulative_Strategy"].iloc[-1],
+                "Trades": df_i["Cumulative_Trades"].iloc[-1]//2,
+                "Sharpe": df_i["Strategy"].mean()/df_i["Strategy"].std()*pow(len(df_i["Strategy"]), 0.5),
+                "Max_Drawdown": abs(df_i["Drawdown"].min()),
                 "Score": 0
             }
-            backtest.plot_res(label)
 
-        # compute best strategies (for each ticker)
-        bst_data = Strategies().best_strategy(res_data)
+        # exports dataframe for analysis (Excel format only, columnar files are already written)
+        if pro_data:
+            with profiler.stage("export_frame", ticker):
+                exporter.export_dataframe({ticker: pro_data})
+            pro_data.clear()
 
-        # exports dataframe for analysis
-        exporter = Exporter()
-        exporter.export_dataframe(pro_data)
+    stats = {**cache.stats(), "forecast_hits": forecasts.hits, "forecast_misses": forecasts.misses, "stages": profiler.records}
 
-        # exports backtesting results
-        exporter.export_results(res_data)
+    # out-of-sample evaluation (picks on rolling train windows, scored on the next test window)
+    if config.section("walkforward").get("enabled", False) and not intraday:
+        with profiler.stage("walkforward", ticker):
+            combos = [{"ind_t": res["Indicator"], "ind_p": res["Parameters"]} for res in res_data.values()]
+            stats["walkforward"] = WalkForward(df, config, cache).run(ticker, combos)
+    return res_data, stats
 
-        # exports backtesting results sorted by best
-        exporter.export_best_results(bst_data)
 
-        # updates best strategies
-        exporter.update_best_results(bst_data)
+def main():
+    config   = Config("config.json")
+    loader   = Loader(config, "tickers.txt", "indicators.txt")
+    profiler = Profiler(config)
+
+    # initialize cache dictionaries
+    res_data = {}
+
+    # import lists
+    intraday   = config.section("intraday").get("enabled", False)
+    tickers    = loader.load_tickers()
+    indicators = loader.load_indicators()
+    if config.section("search").get("enabled", False):
+        indicators = loader.load_space(config.section("search").get("space", "search.txt"))
+
+    try:
+        # download data (whole universe at once)
+        with profiler.stage("download"):
+            if intraday:
+                raw_data, errors = loader.download_bars(tickers)    # bar stores, read in chunks by the backtest
+            else:
+                raw_data, errors = loader.download_many(tickers)
+        for ticker, err in errors.items():
+            print(f"Skipping {ticker}: {err}")
+        tickers = [ticker for ticker in tickers if ticker in raw_data]
+
+        # run each ticker (in a process pool when more than one worker is set)
+        jobs    = [(ticker, raw_data[ticker], indicators, config) for ticker in tickers]
+        workers = config.section("optimizer").get("workers", 1)
+        with profiler.stage("run_tickers"):
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(run_ticker, *job) for job in jobs]
+                    results = [future.result() for future in futures]
+            else:
+                results = [run_ticker(*job) for job in jobs]
+
+        # collect results (in the same order as tickers.txt)
+        wf_data = {}
+        for ticker, (ticker_results, stats) in zip(tickers, results):
+            res_data[ticker] = ticker_results
+            profiler.merge(stats["stages"])
+            if "walkforward" in stats:
+                wf_data[ticker], live = stats["walkforward"]
+                print(f"Walk-forward {ticker}: {WalkForward.summary(wf_data[ticker])}, live pick {live}.")
+            print(f"Cache {ticker}: indicators {stats['hits']} hits, {stats['misses']} misses; forecast {stats['forecast_hits']} hits, {stats['forecast_misses']} misses.")
+
+        # compute best strategies (for each ticker)
+        with profiler.stage("rank"):
+            strategies = Strategies(config)
+            bst_data   = strategies.best_strategy(res_data)
+            if strategies.compare:
+                presets = strategies.compare_presets(res_data)
+
+        # rebuild processed data of the best strategies (charts and Excel view)
+        renderer = Renderer(config)
+        exporter = Exporter(config)
+        plot_sel = renderer.select(bst_data)
+        view_sel = exporter.select(bst_data)
+        registry = ModelRegistry(config)
+        publish  = config.section("forecast").get("publish", True)
+        jobs     = {}
+        top_data = {}
+        for ticker in bst_data:
+            if intraday:
+                # intraday best strategies are streamed to data/debug chunk by chunk (no charts or forecasts)
+                with profiler.stage("rebuild", ticker):
+                    backtester = IntradayBacktester(ticker, [], config)
+                    for label in dict.fromkeys(plot_sel.get(ticker, []) +view_sel.get(ticker, [])):
+                        row = res_data[ticker][label]
+                        backtester.export(label, {"ind_t": row["Indicator"], "ind_p": row["Parameters"]})
+                continue
+            cache     = IndicatorCache()
+            forecasts = ForecastCache(file_config=config)
+            with profiler.stage("rebuild", ticker):
+                for label in dict.fromkeys(plot_sel.get(ticker, []) +view_sel.get(ticker, [])):
+                    row = res_data[ticker][label]
+                    df  = process_frame(ticker, raw_data[ticker], {"ind_t": row["Indicator"], "ind_p": row["Parameters"]}, cache, forecasts, config, profiler)
+                    if label in plot_sel.get(ticker, []):
+                        jobs.update(renderer.jobs(label, df))
+                    if label in view_sel.get(ticker, []):
+                        top_data.setdefault(ticker, FrameStore(ticker, config)).put(label, df)
+
+            # publish the forecast model of the ticker (loaded by the bot)
+            if publish:
+                with profiler.stage("publish", ticker):
+                    registry.publish(ticker, forecasts.get(ticker, raw_data[ticker]))
+
+        # render charts (best strategies only)
+        with profiler.stage("render"):
+            renderer.render(jobs)
+
+        with profiler.stage("export"):
+            # exports dataframe of the best strategies (columnar formats)
+            exporter.export_dataframe(top_data)
+            for store in top_data.values():
+                store.clear()
+
+            # exports backtesting results
+            exporter.export_results(res_data)
+
+            # exports backtesting results sorted by best
+            exporter.export_best_results(bst_data)
+
+            # updates best strategies
+            exporter.update_best_results(bst_data)
+
+            # exports presets comparison
+            if strategies.compare:
+                exporter.export_presets(presets)
+
+            # exports walk-forward folds
+            if wf_data:
+                exporter.export_walkforward(wf_data)
+
+        # run report (stage timings)
+        profiler.export("optimizer")
         
     except Exception as err:
         tb = traceback.format_exc()
@@ -95,4 +246,4 @@ if __name__ == "__main__":
         except Exception as err:
             print(f"Error on attempt {attempt}: {err}.")
             if attempt == max_attempt:
-                print("All attempts failed.")
\ No newline at end of file
+                print("All attempts failed.")
@@ -1,100 +1,124 @@
-import os
+import os, asyncio
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from core.config import Config
 from core.loader import Loader
 from core.indicator import Indicator
 from core.backtester import Backtester
-from core.forecaster import Forecaster
+from core.online import OnlineEngine
+from core.forecaster import ModelRegistry
 from core.strategies import Strategies
 from core.exporter import Exporter
 from core.notifier import Notifier
+from core.profiler import Profiler
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
 
-# import best strategies from strategies.csv: tickers, indicators
+# best strategies from strategies.csv: tickers, indicators
 #csv_file   = "data/results/strategies.csv"                                                                   # from local folder
 csv_file   = "https://drive.google.com/uc?export=download&id=1uwzEz3XullFI02U8QhsE3BCFGRliRZu2" # from cloud
-strategies = Strategies().import_strategies(csv_file)
-tickers    = list(strategies.keys())
 
-# import standard indicators for signal confirmation
-confirmations = Loader().load_confirmations()
 
-def main():
-    # initialize lists
-    alerts = []
-    report = []
-        
-    # run for each ticker
-    for ticker in tickers:
-        print(f"Processing {ticker}")
-        
-        # strategy
-        ind_t     = strategies[ticker]["Indicator"]
-        ind_p     = strategies[ticker]["Parameters"]
-        params    = ind_p.split("_")
-        indicator = {"ind_t": ind_t, "ind_p": [int(p) for p in params]}
-        
-        # download and backtest
-        loader = Loader("config.json", "tickers.txt", "indicators.txt")
-        df = loader.download_data(ticker)
-        confir = []
-        for confirmation in confirmations:
-            df_c = df.copy()
-            df_c = Indicator(confirmation).setup_indicator(df_c)
-            df_c = Backtester(df_c).run_strategy(confirmation)
-            confir.append(df_c["Signal"].iloc[-1])
-        df = Indicator(indicator).setup_indicator(df)
-        forecaster = Forecaster(df)
-        df = forecaster.predictions()
-        df = Backtester(df).run_strategy(indicator)
-
-        # obtain last values: closing price, signal, signal length, volume strength, entry price, forecast
-        last_clo = df["Close"].iloc[-1]
-        last_sig = df["Signal"].iloc[-1]
-        last_str = df["Signal_Length"].iloc[-1]
-        last_vol = df["Volume_Strength"].iloc[-1]
-        last_ent = df["Entry_Price"].iloc[-1]
-        last_for = forecaster.predict_next()
-        last_con = confir.count(1)
-
-        # store report
-        alerts.append({
-            "Ticker": ticker,
-            "Indicator": ind_t,
-            "Parameters": params,
-            "Close": float(last_clo),
-            "Signal": int(last_sig),
-            "Signal_Length": int(last_str),
-            "Signal Confirmation": last_con,
-            "Volume_Strength": float(last_vol),
-            "Entry_Price": float(last_ent),
-            "Predicted_Close": float(last_for)
-        })
+def setup(config):
+    # import best strategies and standard indicators for signal confirmation
+    loader        = Loader(config, "tickers.txt", "indicators.txt")
+    strategies    = Strategies(config).import_strategies(csv_file)
+    confirmations = loader.load_confirmations()
+    return loader, strategies, confirmations
+
+
+def process_ticker(ticker, df, strategy, confirmations, config, profiler=None):
+    profiler = profiler or Profiler(config, enabled=False)
+
+    # strategy
+    ind_t     = strategy["Indicator"]
+    ind_p     = strategy["Parameters"]
+    params    = ind_p.split("_")
+    indicator = {"ind_t": ind_t, "ind_p": [int(p) for p in params]}
     
-    messages = {}
-    for a in alerts:
-        # define signal
-        if a["Signal"] != 0:       
-            verb = "⬆️ BUY" if a["Signal"] == 1 else "⬇️ SELL"
+    # signals (online: only new candles are processed; full history when execution needs the whole path)
+    online = config.section("bot").get("online", False)
+    full   = not online or config.section("execution").get("enabled", False)
+    with profiler.stage("signals", ticker, f"{ind_t}_{ind_p}"):
+        if online:
+            status = OnlineEngine(ticker, ([] if full else [indicator]) +confirmations, config).status(df)
+            main, confir = (None, status) if full else (status[0], status[1:])
+            confir = [s["Signal"] for s in confir]
         else:
-            verb = "⏸️ NEUTRAL"
-        
-        # trading message
-        msg = (f"#{a['Ticker']} | {verb} ({a['Indicator']}{'/'.join(a['Parameters'])}) Duration {a['Signal_Length']:d} | Price R$ {a['Close']:.2f}\n"
-               f"Volume Strength: {a['Volume_Strength']:.2f}\n"
-               f"Signal Confirmation: {a['Signal Confirmation']}/{len(confir)} BUY, {len(confir)-a['Signal Confirmation']}/{len(confir)} SELL\n"
-               f"Entry Price: R$ {a['Entry_Price']:.2f}\n"
-               f"Predicted Price: R$ {a['Predicted_Close']:.2f}")
-        report.append(msg)
-
-        # notifies via Telegram
-        notifier = Notifier()
-        try:
-            payload = {"chat_id": notifier.CHAT_ID, "text": msg, "parse_mode": "HTML", "disable_web_page_preview": True}
-            msg_id  = notifier.send_telegram(payload)
-            messages[a["Ticker"]] = msg_id
-        except Exception as err:
-            print("Telegram error:", err)
+            confir = Backtester.signals_at(df, confirmations)
+    if full:
+        with profiler.stage("backtest", ticker, f"{ind_t}_{ind_p}"):
+            df   = Backtester(Indicator(indicator).setup_indicator(df), config).run_strategy(indicator)
+            main = df[["Signal", "Signal_Length", "Entry_Price", "Volume_Strength"]].iloc[-1].to_dict()
+    else:
+        ma_v   = config.section("backtest").get("ma_volume", 10)
+        volume = df["Volume"].to_numpy(dtype=float)[-ma_v:]
+        vma    = volume.mean() if len(volume) == ma_v else np.nan
+        main["Volume_Strength"] = (volume[-1] -vma)/vma
+    with profiler.stage("forecast", ticker, f"{ind_t}_{ind_p}"):
+        registry   = ModelRegistry(config)
+        forecaster = registry.get(ticker, df)     # model published by the optimizer (refitted when stale)
+        print("Model {}: {}, version {}, {} refits".format(ticker, *registry.status[ticker]))
+
+    # obtain last values: closing price, signal, signal length, volume strength, entry price, forecast
+    last_clo = df["Close"].iloc[-1]
+    last_sig = main["Signal"]
+    last_str = main["Signal_Length"]
+    last_vol = main["Volume_Strength"]
+    last_ent = main["Entry_Price"]
+    last_for = forecaster.predict_next()
+    last_con = confir.count(1)
+
+    # store report
+    return {
+        "Ticker": ticker,
+        "Indicator": ind_t,
+        "Parameters": params,
+        "Close": float(last_clo),
+        "Signal": int(last_sig),
+        "Signal_Length": int(last_str),
+        "Signal Confirmation": last_con,
+        "Confirmations": len(confir),
+        "Volume_Strength": float(last_vol),
+        "Entry_Price": float(last_ent),
+        "Predicted_Close": float(last_for)
+    }
+
+
+def run_ticker(ticker, df, strategy, confirmations, config):
+    # process_ticker in a worker process, with the stage records for the parent profiler
+    profiler = Profiler(config)
+    with profiler.stage("process", ticker):
+        alert = process_ticker(ticker, df, strategy, confirmations, config, profiler)
+    return alert, profiler.records
+
+
+def format_message(a):
+    # define signal
+    if a["Signal"] != 0:       
+        verb = "⬆️ BUY" if a["Signal"] == 1 else "⬇️ SELL"
+    else:
+        verb = "⏸️ NEUTRAL"
     
+    # trading message
+    n = a["Confirmations"]
+    return (f"#{a['Ticker']} | {verb} ({a['Indicator']}{'/'.join(a['Parameters'])}) Duration {a['Signal_Length']:d} | Price R$ {a['Close']:.2f}\n"
+            f"Volume Strength: {a['Volume_Strength']:.2f}\n"
+            f"Signal Confirmation: {a['Signal Confirmation']}/{n} BUY, {n-a['Signal Confirmation']}/{n} SELL\n"
+            f"Entry Price: R$ {a['Entry_Price']:.2f}\n"
+            f"Predicted Price: R$ {a['Predicted_Close']:.2f}")
+
+
+def notify(notifier, msg):
+    # notifies via Telegram (returns message id, None on failure)
+    try:
+        return notifier.send_telegram(notifier.message(msg))
+    except Exception as err:
+        print("Telegram error:", err)
+        return None
+
+
+def notify_summary(notifier, messages):
     # summary in Telegram
     try:
         summary = []
@@ -102,17 +126,129 @@ def main():
             link = f"https://t.me/{notifier.CHAT_ID.lstrip('@')}/{msg_id}"
             summary.append(f'<a href="{link}">{ticker}</a>')
         msg   =  " ○ ".join(summary)
-        payload = {"chat_id": notifier.CHAT_ID, "text": f"<b>Summary:</b>\n{msg}", "parse_mode": "HTML", "disable_web_page_preview": True}
-        notifier.send_telegram(payload)
+        notifier.send_telegram(notifier.message(f"<b>Summary:</b>\n{msg}"))
         
         #payload = {"chat_id": notifier.CHAT_ID, "message_id": sum_id, "disable_notification": True}
         #notifier.pin_telegram(payload)
     except Exception as err:
         print("Telegram error:", err)
+
+
+def main(config):
+    profiler = Profiler(config)
+    with profiler.stage("setup"):
+        loader, strategies, confirmations = setup(config)
+    tickers = list(strategies.keys())
+
+    # initialize lists
+    alerts = []
+    report = []
+
+    # download data (whole universe at once)
+    with profiler.stage("download"):
+        raw_data, errors = loader.download_many(tickers)
+    for ticker, err in errors.items():
+        print(f"Skipping {ticker}: {err}")
+        
+    # run for each ticker
+    for ticker in tickers:
+        if ticker not in raw_data:
+            continue
+        print(f"Processing {ticker}")
+        with profiler.stage("process", ticker):
+            alerts.append(process_ticker(ticker, raw_data[ticker], strategies[ticker], confirmations, config, profiler))
+    
+    # notifies via Telegram (queued, merged when enabled)
+    notifier = Notifier(config)
+    with profiler.stage("notify"):
+        for a in alerts:
+            msg = format_message(a)
+            report.append(msg)
+            notifier.enqueue(a["Ticker"], notifier.message(msg))
+        messages = notifier.flush()
+        notify_summary(notifier, messages)
+    print(f"Telegram stats: {notifier.stats()}")
         
     # export report
-    Exporter().export_report(report)
+    with profiler.stage("export"):
+        Exporter(config).export_report(report)
+    profiler.export("bot")
+
+
+async def main_async(config):
+    """
+    Concurrent pipeline: downloads and Telegram sends overlap with bounded
+    concurrency, indicator/forecast work runs in a process pool and the
+    summary is sent only after every ticker message. Ticker messages are sent
+    in the order of strategies.csv, as in main (each one waits for the
+    previous ticker to be sent or skipped).
+    """
+    profiler = Profiler(config, memory=False)      # stages overlap in threads (workers, one ticker at a time, keep memory)
+    with profiler.stage("setup"):
+        loader, strategies, confirmations = await asyncio.to_thread(setup, config)
+    tickers  = list(strategies.keys())
+    cfg      = config.section("bot")
+    loop     = asyncio.get_running_loop()
+    network  = asyncio.Semaphore(cfg.get("concurrency", 4))
+    notifier = Notifier(config)
+
+    done     = [asyncio.Event() for _ in tickers]
+
+    async def run(i, ticker, pool):
+        try:
+            return await process(i, ticker, pool)
+        finally:
+            done[i].set()
+
+    async def process(i, ticker, pool):
+        try:
+            async with network:
+                df = await asyncio.to_thread(timed, "download", ticker, loader.download_data, ticker)
+            print(f"Processing {ticker}")
+            alert, records = await loop.run_in_executor(pool, run_ticker, ticker, df, strategies[ticker], confirmations, config)
+            profiler.merge(records)
+        except Exception as err:
+            print(f"Skipping {ticker}: {err}")
+            return None, None
+        msg = format_message(alert)
+        if notifier.merge:
+            # merged alerts are sent together once every ticker is done
+            return msg, None
+        if i > 0:
+            await done[i -1].wait()
+        async with network:
+            msg_id = await asyncio.to_thread(timed, "notify", ticker, notify, notifier, msg)
+        return msg, msg_id
+
+    def timed(name, ticker, fn, *args):
+        # blocking call of a worker thread as a ticker stage
+        with profiler.stage(name, ticker):
+            return fn(*args)
+
+    with ProcessPoolExecutor(max_workers=cfg.get("workers", 2)) as pool:
+        results = await asyncio.gather(*(run(i, ticker, pool) for i, ticker in enumerate(tickers)))
+
+    # keep report and summary in the order of strategies.csv
+    report = [msg for msg, _ in results if msg is not None]
+    if notifier.merge:
+        for ticker, (msg, _) in zip(tickers, results):
+            if msg is not None:
+                notifier.enqueue(ticker, notifier.message(msg))
+        messages = await asyncio.to_thread(timed, "notify", None, notifier.flush)
+    else:
+        messages = {ticker: msg_id for ticker, (_, msg_id) in zip(tickers, results) if msg_id is not None}
+    notify_summary(notifier, messages)
+    print(f"Telegram stats: {notifier.stats()}")
+
+    # export report
+    with profiler.stage("export"):
+        Exporter(config).export_report(report)
+    profiler.export("bot")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    config = Config("config.json")
+    if config.section("bot").get("mode", "serial") == "async":
+        asyncio.run(main_async(config))
+    else:
+        main(config)
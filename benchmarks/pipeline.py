@@ -0,0 +1,191 @@
+"""
+Pipeline benchmark: times every stage of the optimizer on synthetic OHLCV
+series (offline), in a temporary workspace with its own config.json.
+
+usage: python benchmarks/pipeline.py [--bars 2000] [--tickers 4] [--repeat 3]
+                                     [--format parquet] [--profile 15] [--json data/results/pipeline.json]
+"""
+import os, sys, json, time, shutil, cProfile, pstats, argparse, platform, tempfile
+import numpy as np
+import pandas as pd
+
+ROOT  = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+TYPES = {"SMA": [20, 50], "WMA": [20, 50], "EMA": [20, 50], "BB": [20, 2], "MACD": [12, 26, 9]}     # supported indicator types
+
+
+def synthetic_ohlcv(n_bars, seed=0, end="2025-06-30"):
+    # geometric random walk with intraday range and log-normal volume
+    rng   = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=n_bars, name="Date")
+    close = 20*np.exp(np.cumsum(rng.normal(0.0002, 0.018, n_bars)))
+    open_ = close*np.exp(rng.normal(0, 0.006, n_bars))
+    high  = np.maximum(open_, close)*np.exp(np.abs(rng.normal(0, 0.008, n_bars)))
+    low   = np.minimum(open_, close)*np.exp(-np.abs(rng.normal(0, 0.008, n_bars)))
+    vol   = rng.lognormal(15, 0.4, n_bars).round()
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": vol}, index=index)
+
+
+def workspace(args):
+    # temporary folder with config, lists and synthetic source files (file provider, no network)
+    path = tempfile.mkdtemp(prefix="b3_bench_")
+    for folder in ("data/source", "data/debug", "data/results", "data/report"):
+        os.makedirs(os.path.join(path, folder), exist_ok=True)
+
+    with open(os.path.join(ROOT, "config.json"), "r", encoding="utf-8") as f:
+        config = json.load(f)
+    data = {}
+    for i in range(args.tickers):
+        ticker = f"SYN{i:03d}"
+        df = synthetic_ohlcv(args.bars, seed=i)
+        df.to_parquet(os.path.join(path, "data/source", f"{ticker}.SA.parquet"))
+        data[ticker] = df
+    config.update({"start": str(df.index[0].date()), "end": str((df.index[-1] +pd.Timedelta(days=1)).date())})
+    config["data"].update({"provider": "file", "source": "data/source", "store": False})
+    config["optimizer"]["workers"] = 1
+    config["plot"]["enabled"] = False
+    config["export"]["format"] = args.format
+    with open(os.path.join(path, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    with open(os.path.join(path, "tickers.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(data) +"\n")
+    shutil.copy(os.path.join(ROOT, "indicators.txt"), path)
+    return path, data
+
+
+def measure(fn, repeat, profile=0, setup=None, warmup=True):
+    # best and mean wall time of 'repeat' calls (after an untimed warm-up call, which
+    # keeps lazy imports out of the timings), plus one extra profiled call
+    if warmup:
+        fn()
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() -start)
+    result = {"min": min(times), "mean": sum(times)/len(times), "runs": len(times)}
+
+    if profile:
+        if setup:
+            setup()
+        profiler = cProfile.Profile()
+        profiler.runcall(fn)
+        stats = pstats.Stats(profiler).stats
+        result["profile"] = [
+            {"function": f"{os.path.relpath(file, ROOT) if file.startswith(ROOT) else file}:{line}({name})",
+             "calls": nc, "tottime": tt, "cumtime": ct}
+            for (file, line, name), (_, nc, tt, ct, _) in sorted(stats.items(), key=lambda s: -s[1][3])[:profile]
+        ]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on synthetic data.")
+    parser.add_argument("--bars", type=int, default=2000, help="bars per ticker")
+    parser.add_argument("--tickers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format", default="parquet", choices=["excel", "parquet", "feather"])
+    parser.add_argument("--profile", type=int, default=0, help="keep the top N functions (cProfile) of each stage")
+    parser.add_argument("--json", default=None, help="save results to this file")
+    args = parser.parse_args()
+
+    import b3_trading_signals as optimizer      # changes the working directory to the repository
+    from core.config import Config
+    from core.loader import Loader
+    from core.indicator import Indicator
+    from core.backtester import Backtester
+    from core.grid import GridBacktester
+    from core.execution import ExecutionEngine
+    from core.forecaster import Forecaster
+    from core.strategies import Strategies
+    from core.exporter import Exporter
+    from core.walkforward import WalkForward
+
+    path, data = workspace(args)
+    os.chdir(path)
+    try:
+        config     = Config("config.json")
+        indicators = Loader(config, "tickers.txt", "indicators.txt").load_indicators()
+        ticker, df = next(iter(data.items()))
+        results    = {}
+
+        def stage(name, fn, setup=None):
+            results[name] = measure(fn, args.repeat, args.profile, setup, warmup=setup is None)
+            print(f"{name:<36} {results[name]['min']*1e3:10.2f} ms (mean {results[name]['mean']*1e3:.2f} ms)")
+
+        # indicators (first combination of each supported type in indicators.txt, a default one otherwise)
+        types = {t: {"ind_t": t, "ind_p": p} for t, p in TYPES.items()}
+        for ind in reversed(indicators):
+            types[ind["ind_t"]] = ind
+        for indicator in types.values():
+            label = f"{indicator['ind_t']}_{'_'.join(str(p) for p in indicator['ind_p'])}"
+            stage(f"indicator.{label}", lambda: Indicator(indicator).setup_indicator(df))
+
+        # backtest of one combination
+        indicator = indicators[0]
+        frame     = Indicator(indicator).setup_indicator(df)
+        stage("backtester.run_strategy", lambda: Backtester(frame, config).run_strategy(indicator))
+
+        # execution of every combination (vectorized rules, then costs/stops/shorts)
+        grid = GridBacktester(df, config)
+        S    = grid.signal_matrix(indicators)
+        stage("grid.execute", lambda: grid.execute(S))
+        engine = ExecutionEngine(config)
+        engine.short, engine.stop_loss = True, 0.05
+        stage(f"execution.simulate[{'numba' if engine.jit and ExecutionEngine.compiled() else 'numpy'}]",
+              lambda: engine.simulate(df["Close"].to_numpy(), S))
+
+        # forecaster
+        forecaster = Forecaster(df, config)
+        stage("forecaster.predictions", forecaster.predictions)
+        stage("forecaster.predict_next", forecaster.predict_next)
+
+        # results of every ticker, then ranking and exports
+        res_data = {}
+        for t, d in data.items():
+            res_data[t], _ = optimizer.run_ticker(t, d, indicators, config)
+        stage("strategies.best_strategy", lambda: Strategies(config).best_strategy(res_data))
+        bst_data = Strategies(config).best_strategy(res_data)
+        presets  = Strategies(config).compare_presets(res_data, ["basic", "balanced", "agressive", "defensive"])
+        wf_data  = {t: WalkForward(d, config).run(t, indicators)[0] for t, d in data.items()}
+        report   = [f"#{t} | {bst_df['Indicator'].iloc[0]} | Price R$ {data[t]['Close'].iloc[-1]:.2f}" for t, bst_df in bst_data.items()]
+        exporter = Exporter(config)
+        top_data = {t: {label: Indicator({"ind_t": res_data[t][label]["Indicator"], "ind_p": res_data[t][label]["Parameters"]}).setup_indicator(data[t])
+                        for label in bst_df.index[:3]} for t, bst_df in bst_data.items()}
+        stage("exporter.export_results", lambda: exporter.export_results(res_data))
+        stage("exporter.export_best_results", lambda: exporter.export_best_results(bst_data))
+        stage("exporter.update_best_results", lambda: exporter.update_best_results(bst_data))
+        stage("exporter.export_presets", lambda: exporter.export_presets(presets))
+        stage("exporter.export_walkforward", lambda: exporter.export_walkforward(wf_data))
+        stage("exporter.export_report", lambda: exporter.export_report(report))
+        stage("exporter.export_dataframe", lambda: exporter.export_dataframe(top_data))
+        if exporter.format != "excel":
+            stage("exporter.write_frame", lambda: exporter.write_frame(ticker, f"{ticker}_{indicator['ind_t']}", frame))
+
+        # end to end (one ticker, then the whole universe; cold caches)
+        def cold():
+            shutil.rmtree("data/models", ignore_errors=True)
+            shutil.rmtree("data/state", ignore_errors=True)
+        stage("optimizer.run_ticker", lambda: optimizer.run_ticker(ticker, df, indicators, config), cold)
+        stage("optimizer.main", optimizer.main, cold)
+
+        report = {
+            "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "params": {"bars": args.bars, "tickers": args.tickers, "combinations": len(indicators), "repeat": args.repeat,
+                       "format": args.format, "engine": config.section("backtest").get("engine", "frame")},
+            "stages": results,
+        }
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(path, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
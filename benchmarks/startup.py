@@ -0,0 +1,47 @@
+"""
+Startup benchmark: import time of each entry point in a fresh interpreter,
+plus which heavy dependencies the import pulled in.
+
+usage: python benchmarks/startup.py [--runs 5] [--json data/results/startup.json]
+"""
+import os, sys, json, time, argparse, subprocess
+
+ROOT         = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ["b3_trading_signals", "b3_trading_signals_bot"]
+HEAVY        = ["sklearn", "scipy", "matplotlib", "yfinance", "openpyxl", "pyarrow", "requests", "numba"]
+
+
+def measure(module):
+    # one cold import in a new process (interpreter start included in 'process')
+    code = (f"import sys, time; t = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() -t); print(','.join(m for m in {HEAVY!r} if m in sys.modules))")
+    start = time.perf_counter()
+    out   = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout.splitlines()
+    return {"import": float(out[0]), "process": time.perf_counter() -start, "heavy": [m for m in out[1].split(",") if m]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of each entry point.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", default=None, help="save results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for module in ENTRY_POINTS:
+        runs = [measure(module) for _ in range(args.runs)]
+        results[module] = {
+            "import_min": min(r["import"] for r in runs),
+            "import_mean": sum(r["import"] for r in runs)/len(runs),
+            "process_mean": sum(r["process"] for r in runs)/len(runs),
+            "heavy_modules": runs[-1]["heavy"],
+        }
+        r = results[module]
+        print(f"{module:<25} import {r['import_min']:.3f}s (mean {r['import_mean']:.3f}s), process {r['process_mean']:.3f}s, heavy: {', '.join(r['heavy_modules']) or '-'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,22 @@
-import json, matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+import numpy as np
+from core.config import Config
+from core.indicator import Indicator
+from core.kernels import Kernel
+from core.execution import ExecutionEngine
 
 
 # =====================================================
 #  Backtester
 # =====================================================
 class Backtester:
-    def __init__(self, df, file_config="config.json"):
+    def __init__(self, df, file_config="config.json", cache=None):
         self.df = df.copy()
+        self.cache = cache
+        self.engine = ExecutionEngine(file_config)
         self.load_config(file_config)
         
-    def load_config(self, path):
-        with open(path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            cfg    = config.get("backtest", {})
-            
+    def load_config(self, config):
+        cfg = Config.load(config).section("backtest")
         self.ma_v = cfg.get("ma_volume", 10)
 
     def run_strategy(self, indicator):
@@ -25,7 +26,7 @@ class Backtester:
             params = indicator["ind_p"]   
     
             # calculate volume MA
-            df["VMA"] = df["Volume"].rolling(window=self.ma_v).mean()        # volume MA
+            df["VMA"] = Indicator({}, self.cache).compute(("VMA", self.ma_v), Indicator.sma, df["Volume"], self.ma_v)    # volume MA
 
             # generate buy/sell signals
             df["Signal"] = 0
@@ -40,8 +41,8 @@ class Backtester:
                     df.loc[df["Short"] < df["Long"], "Signal"] = -1         
                 elif len(params) == 3:
                     # 3 MAs crossover
-                    df.loc[(df["Short"] > df["Med"]) & (df["Med"] > df["Long"]), "Signal"] = 1
-                    df.loc[(df["Short"] < df["Med"]) & (df["Med"] < df["Long"]), "Signal"] = -1
+                    df.loc[(df["Short"] > df["Mid"]) & (df["Mid"] > df["Long"]), "Signal"] = 1
+                    df.loc[(df["Short"] < df["Mid"]) & (df["Mid"] < df["Long"]), "Signal"] = -1
             elif ind_t == "BB":
                 df.loc[df["Close"] < df["BB_Lower"], "Signal"] = 1          # buy signal (BB)
                 df.loc[df["Close"] > df["BB_Upper"], "Signal"] = -1         # seel signal (BB)
@@ -54,14 +55,23 @@ class Backtester:
             df["Volume_Strength"] = (df["Volume"] -df["VMA"])/df["VMA"]                                                 # volume strenght
 
             # simulate execution (backtest)
-            df["Position"] = df["Signal"].shift(1)                      # simulate position (using previous sample)
-            df.loc[df["Position"] == -1, "Position"] = 0                # comment if also desired selling operations  
-            df["Trade"] = df["Position"].diff().abs()                   # simulate trade
-            df["Entry_Price"] = df["Close"].where(df["Trade"] == 1)     # entry price
-            df["Entry_Price"] = df["Entry_Price"].ffill()
-            df["Return"] = df["Close"].pct_change()                     # asset percentage variation (in relation to previous sample)
-            df["Strategy"] = df["Position"]*df["Return"]                # return of the strategy
-            df["Strategy"] = df["Strategy"].fillna(0.00001)
+            if self.engine.enabled:
+                # costs, slippage, stops and shorts (path-dependent execution)
+                P, R, T = self.engine.simulate(df["Close"].to_numpy(dtype=float), df["Signal"].to_numpy()[:, None])
+                df["Position"] = P[:, 0]
+                df["Trade"] = T[:, 0]
+                df["Entry_Price"] = df["Close"].shift(1).where((df["Trade"] > 0) & (df["Position"] != 0)).ffill()
+                df["Return"] = df["Close"].pct_change()
+                df["Strategy"] = R[:, 0]
+            else:
+                df["Position"] = df["Signal"].shift(1)                      # simulate position (using previous sample)
+                df.loc[df["Position"] == -1, "Position"] = 0                # comment if also desired selling operations  
+                df["Trade"] = df["Position"].diff().abs()                   # simulate trade
+                df["Entry_Price"] = df["Close"].where(df["Trade"] == 1)     # entry price
+                df["Entry_Price"] = df["Entry_Price"].ffill()
+                df["Return"] = df["Close"].pct_change()                     # asset percentage variation (in relation to previous sample)
+                df["Strategy"] = df["Position"]*df["Return"]                # return of the strategy
+                df["Strategy"] = df["Strategy"].fillna(0.00001)
             
             # compare benchmark vs current strategy
             df["Cumulative_Market"] = (1 +df["Return"]).cumprod()       # cumulative return buy & hold strategy
@@ -80,72 +90,79 @@ class Backtester:
             raise RuntimeError(f"Error in backtest run_strategy: {err}") from err
         return df
 
-    def plot_price(self, axis, ticker):
-        axis.plot(self.df.index, self.df["Close"], label=ticker)
-        axis.grid(True)
-    
-    def plot_ma(self, axis, ind_t, params):
-        if "Short" in self.df and len(params) >= 1:
-            axis.plot(self.df.index, self.df["Short"], label=f"{ind_t}{params[0]}")
-        if "Long" in self.df and len(params) == 2:
-            axis.plot(self.df.index, self.df["Long"], label=f"{ind_t}{params[1]}")
-        if "Long" in self.df and len(params) >= 3:
-            axis.plot(self.df.index, self.df["Long"], label=f"{ind_t}{params[1]}")
-        if "Med" in self.df and len(params) >= 3:
-             axis.plot(self.df.index, self.df["Mid"], label=f"{ind_t}{params[2]}")
-    
-    def plot_bb(self, axis, params):
-        axis.plot(self.df.index, self.df["BB_Mid"], label=f"BB mean {params[0]}")
-        axis.plot(self.df.index, self.df["BB_Upper"], color='r', label=f"BB std {params[1]}")
-        axis.plot(self.df.index, self.df["BB_Lower"], color='r')
-        
-    def plot_macd(self, axis):
-        axis.plot(self.df.index, self.df["MACD"], label="MACD")
-        axis.plot(self.df.index, self.df["MACD_Signal"], label="MACD_Signal")
-        axis.bar(self.df.index, self.df["MACD_Histogram"], color='r', label="Histogram", alpha=0.4)
-        axis.axhline(0, linewidth=1)
-        axis.grid(True)
 
-    def plot_res(self, label):
-        ticker, ind_t, *params = label.split("_")
+    @staticmethod
+    def signals_at(df, indicators, bar=-1):
+        """
+        Buy/sell signal (1, -1 or 0) of each indicator at a single bar, same
+        rules as run_strategy but using only the trailing window that the
+        signal depends on. SMAs of all indicators come from one cumulative sum.
+        """
+        close = df["Close"].to_numpy(dtype=float)
+        x     = close[:bar % len(close) +1]
+
+        # one cumulative sum over the longest SMA window
+        windows = [p for ind in indicators if ind["ind_t"] in ("SMA", "BB") for p in ind["ind_p"][:1 if ind["ind_t"] == "BB" else None]]
+        tail    = x[-max(windows, default=1):]
+        cs      = np.concatenate(([0.0], np.cumsum(tail)))
+
+        def ma(ind_t, p):
+            if ind_t == "EMA":
+                return Kernel.ema(x, p)[-1]
+            if len(x) < p:
+                return np.nan
+            if ind_t == "SMA":
+                return (cs[-1] -cs[-1-p])/p
+            w = np.arange(1, p+1, dtype=float)
+            return x[-p:] @ w/w.sum()
 
-        # plot price and indicator
+        signals = []
+        for indicator in indicators:
+            ind_t  = indicator["ind_t"]
+            params = indicator["ind_p"]
+            if ind_t in ["SMA", "EMA", "WMA"]:
+                names  = {1: ["Short"], 2: ["Short", "Long"], 3: ["Short", "Mid", "Long"]}[len(params)]
+                values = {name: ma(ind_t, p) for name, p in zip(names, params)}
+            elif ind_t == "BB":
+                window, std_dev = params
+                mid  = ma("SMA", window)
+                std  = x[-window:].std(ddof=1) if len(x) >= window else np.nan
+                values = {"BB_Upper": mid +std_dev*std, "BB_Lower": mid -std_dev*std}
+            elif ind_t == "MACD":
+                fast, slow, signal = params
+                macd = Kernel.ema(x, fast) -Kernel.ema(x, slow)
+                values = {"MACD": macd[-1], "MACD_Signal": Kernel.ema(macd, signal)[-1]}
+            else:
+                raise ValueError(f"Unsupported indicator: {ind_t}.")
+            signals.append(Backtester.signal_rule(indicator, x[-1], values))
+        return signals
+
+    @staticmethod
+    def signal_rule(indicator, close, values):
+        """
+        Signal (1, -1 or 0) from the close and indicator values (same names
+        as the setup_indicator columns), rules of run_strategy. Works on one
+        bar (scalars) or on several bars at once (arrays, int8 output).
+        """
+        ind_t  = indicator["ind_t"]
+        params = indicator["ind_p"]
         if ind_t in ["SMA", "EMA", "WMA"]:
-            fig, axis = plt.subplots(figsize=(12,6))
-            self.plot_price(axis, ticker)
-            self.plot_ma(axis, ind_t, params)
-            axis.legend()
-            axis.set_title(f"{ticker} - Price")
+            if len(params) == 1:
+                buy, sell = close > values["Short"], close < values["Short"]
+            elif len(params) == 2:
+                buy, sell = values["Short"] > values["Long"], values["Short"] < values["Long"]
+            else:
+                buy  = (values["Short"] > values["Mid"]) & (values["Mid"] > values["Long"])
+                sell = (values["Short"] < values["Mid"]) & (values["Mid"] < values["Long"])
         elif ind_t == "BB":
-            fig, axis = plt.subplots(figsize=(12,6))
-            self.plot_price(axis, ticker)
-            self.plot_bb(axis, params)
-            axis.legend()
-            axis.set_title(f"{ticker} - Price")
+            buy, sell = close < values["BB_Lower"], close > values["BB_Upper"]
         elif ind_t == "MACD":
-            fig, (axis_price, axis_macd) = plt.subplots(2, 1, figsize=(12,8), sharex=True, gridspec_kw={"height_ratios": [3, 1]})
-            self.plot_price(axis_price, ticker)
-            axis_price.set_title(f"{ticker} - Price")
-            self.plot_macd(axis_macd)
-        plt.tight_layout()
-        plt.savefig(f"data/results/{label}.png", dpi=300, bbox_inches="tight")
-        plt.close()
-        
-        # plot returns
-        plt.figure(figsize=(12,6))
-        plt.plot(self.df.index, self.df["Close"], label=f"{ticker}")
-        plt.plot(self.df.index, self.df["Predicted_Close"], label="Predictions")
-        plt.title(f"{ticker} - Price")
-        plt.legend()
-        plt.grid(True)
-        plt.savefig(f"data/results/{label}_forecast.png", dpi=300, bbox_inches="tight")
-        plt.close()
+            buy, sell = values["MACD"] > values["MACD_Signal"], values["MACD"] < values["MACD_Signal"]
+        else:
+            raise ValueError(f"Unsupported indicator: {ind_t}.")
+        signal = np.where(sell, -1, np.where(buy, 1, 0)).astype(np.int8)
+        return int(signal) if signal.ndim == 0 else signal
 
-        plt.figure(figsize=(12,6))
-        plt.plot(self.df.index, self.df["Cumulative_Market"], label="Buy & Hold")
-        plt.plot(self.df.index, self.df["Cumulative_Strategy"], label="Strategy")
-        plt.title(f"{ticker} - Backtest {ind_t}{'/'.join(params)}")
-        plt.legend()
-        plt.grid(True)
-        plt.savefig(f"data/results/{label}_backtest.png", dpi=300, bbox_inches="tight")
-        plt.close()
\ No newline at end of file
+    @staticmethod
+    def signal_at(df, indicator, bar=-1):
+        return Backtester.signals_at(df, [indicator], bar)[0]
@@ -0,0 +1,112 @@
+import os, json, shutil
+import numpy as np
+import pandas as pd
+from core.config import Config
+
+
+# =====================================================
+#  Bar Store
+# =====================================================
+class BarStore:
+    """
+    Bars of one ticker at one resolution (e.g. 1-minute or 5-minute) kept
+    as append-only raw column files (dates as int64 ns, Close and Volume as
+    float64) read through memory maps, so a multi-year intraday history is
+    never loaded at once: readers take chunks of views from the maps and
+    appends only write the new bars.
+    """
+    COLUMNS = {"Date": np.int64, "Close": np.float64, "Volume": np.float64}
+
+    def __init__(self, ticker, file_config="config.json"):
+        self.ticker = ticker
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("intraday")
+        self.interval = cfg.get("interval", "5m")
+        self.chunk    = cfg.get("chunk", 100000)        # bars per chunk
+        self.path     = os.path.join(cfg.get("path", "data/bars"), self.interval, self.ticker)
+        if self.chunk < 1:
+            raise ValueError("Intraday chunk must have at least one bar.")
+
+    def file(self, column):
+        return os.path.join(self.path, f"{column}.bin")
+
+    def column(self, name):
+        # read-only memory map of one column (empty array before the first append)
+        file = self.file(name)
+        if not os.path.exists(file) or os.path.getsize(file) == 0:
+            return np.empty(0, dtype=self.COLUMNS[name])
+        return np.memmap(file, dtype=self.COLUMNS[name], mode="r")
+
+    def __len__(self):
+        # complete rows (a column may be ahead after an interrupted append)
+        sizes = [os.path.getsize(self.file(c)) if os.path.exists(self.file(c)) else 0 for c in self.COLUMNS]
+        return min(size//np.dtype(dtype).itemsize for size, dtype in zip(sizes, self.COLUMNS.values()))
+
+    def last(self):
+        # timestamp of the last stored bar (None when empty)
+        n = len(self)
+        return pd.Timestamp(int(self.column("Date")[n -1])) if n else None
+
+    def append(self, df):
+        """
+        Appends the bars of df after the last stored bar (Close/Volume indexed
+        by date, any order). Returns the number of appended bars.
+        """
+        df   = df[["Close", "Volume"]].sort_index()
+        if getattr(df.index, "tz", None) is not None:
+            df.index = df.index.tz_localize(None)           # exchange wall time
+        last = self.last()
+        if last is not None:
+            df = df[df.index > last]
+        if df.empty:
+            return 0
+
+        os.makedirs(self.path, exist_ok=True)
+        n = len(self)
+        columns = {"Date": pd.DatetimeIndex(df.index).as_unit("ns").asi8, "Close": df["Close"].to_numpy(), "Volume": df["Volume"].to_numpy()}
+        for name, values in columns.items():
+            with open(self.file(name), "r+b" if os.path.exists(self.file(name)) else "wb") as f:
+                f.truncate(n*np.dtype(self.COLUMNS[name]).itemsize)     # drop the rest of an interrupted append
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(values, dtype=self.COLUMNS[name]).tobytes())
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"ticker": self.ticker, "interval": self.interval, "bars": n +len(df), "last": str(df.index[-1])}, f)
+        return len(df)
+
+    def ingest(self, file, start=None, end=None):
+        # append the bars of a source file (CSV or Parquet, indexed by date) in [start, end), chunk by chunk
+        if file.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            batches = (batch.to_pandas() for batch in pq.ParquetFile(file).iter_batches(batch_size=self.chunk))
+        else:
+            batches = pd.read_csv(file, index_col=0, parse_dates=True, chunksize=self.chunk)
+
+        added = 0
+        for df in batches:
+            if "Date" in df.columns:
+                df = df.set_index("Date")
+            df.index = pd.DatetimeIndex(df.index)
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            if end is not None:
+                df = df[df.index < pd.Timestamp(end)]
+            added += self.append(df)
+        return added
+
+    def chunks(self, start=0):
+        # (dates, close, volume) views of chunk bars from row 'start'
+        n = len(self)
+        dates, close, volume = (self.column(c) for c in self.COLUMNS)
+        for i in range(start, n, self.chunk):
+            j = min(i +self.chunk, n)
+            yield dates[i:j], close[i:j], volume[i:j]
+
+    def frame(self, start=0, end=None):
+        # rows [start, end) as a dataframe (only for small ranges)
+        dates, close, volume = (self.column(c)[start:end] for c in self.COLUMNS)
+        return pd.DataFrame({"Close": np.asarray(close), "Volume": np.asarray(volume)}, index=pd.DatetimeIndex(np.asarray(dates), name="Date"))
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,156 @@
+import os, json
+from datetime import datetime
+
+
+# =====================================================
+#  Config
+# =====================================================
+class Config:
+    """
+    Parsed and validated config.json. Entry points load it once and pass
+    it to every class; classes given a path go through Config.load, which
+    parses each file only once per process (until it is modified).
+    """
+    # expected type (or allowed values) of each known key
+    RULES = {
+        "start":                str,
+        "end":                  str,
+        "preset":               ["basic", "balanced", "agressive", "defensive"],
+        "data.provider":        ["yahoo", "file"],
+        "data.source":          str,
+        "data.store":           bool,
+        "data.path":            str,
+        "data.workers":         int,
+        "optimizer.workers":    int,
+        "plot.enabled":         bool,
+        "plot.top_n":           int,
+        "plot.dpi":             int,
+        "plot.format":          ["png", "jpg", "svg", "pdf"],
+        "plot.workers":         int,
+        "export.format":        ["excel", "parquet", "feather"],
+        "export.excel_top_n":   int,
+        "bot.mode":             ["serial", "async"],
+        "bot.concurrency":      int,
+        "bot.workers":          int,
+        "bot.online":           bool,
+        "bot.state":            str,
+        "notifier.interval":    (int, float),
+        "notifier.per_minute":  int,
+        "notifier.retries":     int,
+        "notifier.backoff":     (int, float),
+        "notifier.merge":       bool,
+        "notifier.max_length":  int,
+        "notifier.pool":        int,
+        "forecast.method":      ["RF", "DT"],
+        "forecast.n_estimators": int,
+        "forecast.max_depth":   int,
+        "forecast.lags":        int,
+        "forecast.features":    list,
+        "forecast.dtype":       ["float32", "float64"],
+        "forecast.publish":     bool,
+        "forecast.registry":    str,
+        "forecast.source":      str,
+        "forecast.cache":       str,
+        "forecast.max_age":     int,
+        "forecast.refit":       ["warm", "full"],
+        "forecast.warm_trees":  int,
+        "backtest.ma_volume":   int,
+        "backtest.engine":      ["frame", "grid", "incremental"],
+        "backtest.preset":      ["basic", "balanced", "agressive", "defensive"],
+        "backtest.top_k":       int,
+        "backtest.compare":     list,
+        "backtest.state":       str,
+        "search.enabled":       bool,
+        "search.space":         str,
+        "search.method":        ["halving", "refine"],
+        "search.budget":        int,
+        "search.time":          (int, float),
+        "search.eta":           int,
+        "search.min_bars":      int,
+        "search.points":        int,
+        "search.top_k":         int,
+        "search.batch":         int,
+        "search.seed":          int,
+        "frames.columns":       list,
+        "frames.downcast":      bool,
+        "frames.spill":         bool,
+        "frames.path":          str,
+        "walkforward.enabled":  bool,
+        "walkforward.train":    int,
+        "walkforward.test":     int,
+        "walkforward.step":     int,
+        "walkforward.workers":  int,
+        "execution.enabled":    bool,
+        "execution.fees":       (int, float),
+        "execution.slippage":   (int, float),
+        "execution.brokerage":  (int, float),
+        "execution.capital":    (int, float),
+        "execution.borrow":     (int, float),
+        "execution.stop_loss":  (int, float),
+        "execution.take_profit": (int, float),
+        "execution.short":      bool,
+        "execution.jit":        bool,
+        "intraday.enabled":     bool,
+        "intraday.interval":    ["1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"],
+        "intraday.chunk":       int,
+        "intraday.min_bars":    int,
+        "intraday.path":        str,
+        "intraday.state":       str,
+        "profile.enabled":      bool,
+        "profile.memory":       bool,
+        "profile.cprofile":     list,
+        "profile.path":         str,
+    }
+    _loaded = {}
+
+    def __init__(self, path="config.json"):
+        self.path = path
+        with open(path, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.validate()
+
+    @classmethod
+    def load(cls, config="config.json"):
+        # shared instance for a path (a Config is returned as is)
+        if isinstance(config, Config):
+            return config
+        key = (os.path.abspath(config), os.path.getmtime(config))
+        if key not in cls._loaded:
+            cls._loaded[key] = cls(config)
+        return cls._loaded[key]
+
+    def validate(self):
+        for key, rule in self.RULES.items():
+            *section, name = key.split(".")
+            values = self.section(section[0]) if section else self.data
+            if name not in values:
+                continue
+            value = values[name]
+            if isinstance(rule, list):
+                if value not in rule:
+                    raise ValueError(f"Invalid value for '{key}' in {self.path}: {value!r} (expected one of {rule}).")
+            elif not isinstance(value, rule) or (rule is int and isinstance(value, bool)):
+                raise ValueError(f"Invalid type for '{key}' in {self.path}: {value!r}.")
+            elif rule is int and value < 0:
+                raise ValueError(f"Invalid value for '{key}' in {self.path}: {value!r} (expected >= 0).")
+
+        # the incremental and intraday engines are frictionless (long only, no costs or stops)
+        if self.section("execution").get("enabled", False):
+            if self.section("backtest").get("engine", "frame") == "incremental" or self.section("intraday").get("enabled", False):
+                raise ValueError(f"'execution.enabled' in {self.path} needs the frame or grid engine (not incremental or intraday).")
+
+        for key in ("start", "end"):
+            if key in self.data:
+                try:
+                    datetime.fromisoformat(self.data[key])
+                except ValueError as err:
+                    raise ValueError(f"Invalid date for '{key}' in {self.path}: {self.data[key]!r}.") from err
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def section(self, name):
+        section = self.data.get(name, {})
+        if not isinstance(section, dict):
+            raise ValueError(f"Invalid section '{name}' in {self.path}.")
+        return section
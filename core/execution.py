@@ -0,0 +1,155 @@
+import numpy as np
+from core.config import Config
+
+
+def simulate_loop(close, S, fees, slippage, brokerage, borrow, stop_loss, take_profit, short):
+    """
+    Typed loop over combinations and bars (compiled with numba when
+    available). Returns positions, strategy returns and trades (bars x combos).
+    """
+    n, m = S.shape
+    P = np.full((n, m), np.nan)
+    R = np.full((n, m), 0.00001)
+    T = np.full((n, m), np.nan)
+    for j in range(m):
+        pos, entry, blocked, equity = 0.0, 0.0, 0.0, 1.0
+        for t in range(1, n):
+            # target position from the previous signal (flat after a stop until the signal changes)
+            target = float(S[t-1, j])
+            if not short and target < 0:
+                target = 0.0
+            if blocked != 0:
+                if target == blocked:
+                    target = 0.0
+                else:
+                    blocked = 0.0
+            prev, pos = pos, target
+            trade = abs(pos -prev)
+            if trade > 0 and pos != 0:
+                entry = close[t-1]
+
+            # return of the bar net of costs (the first position has no trade, as in the vectorized engine)
+            ret = pos*(close[t]/close[t-1] -1)
+            if t > 1:
+                T[t, j] = trade
+                if trade > 0:
+                    ret -= trade*(fees +slippage) +brokerage/equity
+            if pos < 0:
+                ret -= borrow
+            P[t, j] = pos
+
+            # stop loss / take profit on the close, exit at the same close
+            if pos != 0 and entry > 0:
+                move = pos*(close[t]/entry -1)
+                if (stop_loss > 0 and move <= -stop_loss) or (take_profit > 0 and move >= take_profit):
+                    ret -= abs(pos)*(fees +slippage) +brokerage/equity
+                    T[t, j] = (0.0 if np.isnan(T[t, j]) else T[t, j]) +abs(pos)
+                    blocked, pos = pos, 0.0
+            R[t, j] = ret
+            equity *= 1 +ret
+    return P, R, T
+
+
+def simulate_numpy(close, S, fees, slippage, brokerage, borrow, stop_loss, take_profit, short):
+    """
+    Same rules as simulate_loop, looping over bars with every combination
+    of the bar updated at once (NumPy fallback when numba is not installed).
+    """
+    n, m = S.shape
+    P = np.full((n, m), np.nan)
+    R = np.full((n, m), 0.00001)
+    T = np.full((n, m), np.nan)
+    if stop_loss <= 0 and take_profit <= 0 and brokerage <= 0:
+        # no path dependence left: positions and costs as 2-D array operations
+        if n > 1:
+            P[1:] = S[:-1] if short else np.maximum(S[:-1], 0)
+            T[2:] = np.abs(np.diff(P[1:], axis=0))
+            R[1:] = P[1:]*(close[1:]/close[:-1] -1)[:, None] -np.where(P[1:] < 0, borrow, 0.0)
+            R[2:] -= T[2:]*(fees +slippage)
+        return P, R, T
+
+    pos, entry, blocked, equity = np.zeros(m), np.zeros(m), np.zeros(m), np.ones(m)
+    for t in range(1, n):
+        target = S[t-1].astype(float)
+        if not short:
+            target = np.maximum(target, 0)
+        stay    = (blocked != 0) & (target == blocked)
+        blocked = np.where((blocked != 0) & ~stay, 0.0, blocked)
+        target  = np.where(stay, 0.0, target)
+        prev, pos = pos, target
+        trade = np.abs(pos -prev)
+        entry = np.where((trade > 0) & (pos != 0), close[t-1], entry)
+
+        ret = pos*(close[t]/close[t-1] -1)
+        if t > 1:
+            T[t] = trade
+            ret -= np.where(trade > 0, trade*(fees +slippage) +brokerage/equity, 0.0)
+        ret -= np.where(pos < 0, borrow, 0.0)
+        P[t] = pos
+
+        if stop_loss > 0 or take_profit > 0:
+            move = np.where((pos != 0) & (entry > 0), pos*(close[t]/np.where(entry > 0, entry, 1.0) -1), 0.0)
+            exit = (pos != 0) & (entry > 0) & (((stop_loss > 0) & (move <= -stop_loss)) | ((take_profit > 0) & (move >= take_profit)))
+            if exit.any():
+                ret     -= np.where(exit, np.abs(pos)*(fees +slippage) +brokerage/equity, 0.0)
+                T[t]     = np.where(exit, np.nan_to_num(T[t]) +np.abs(pos), T[t])
+                blocked  = np.where(exit, pos, blocked)
+                pos      = np.where(exit, 0.0, pos)
+        R[t] = ret
+        equity *= 1 +ret
+    return P, R, T
+
+
+# =====================================================
+#  Execution Engine
+# =====================================================
+class ExecutionEngine:
+    """
+    Path-dependent execution for the backtests: B3 fees (trading and
+    settlement fees as a fraction of the traded value), brokerage per order,
+    slippage, stop loss / take profit on the close and short selling with a
+    borrow fee. Runs as a compiled loop when numba is installed and as a
+    NumPy loop over bars (all combinations at once) otherwise.
+    """
+    def __init__(self, file_config="config.json"):
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("execution")
+        self.enabled     = cfg.get("enabled", False)
+        self.fees        = cfg.get("fees", 0.0003)          # B3 trading + settlement fees (fraction per trade)
+        self.slippage    = cfg.get("slippage", 0.0)         # fraction of the price per trade
+        self.brokerage   = cfg.get("brokerage", 0.0)        # R$ per order
+        self.capital     = cfg.get("capital", 10000.0)      # R$ at the start (brokerage as a fraction of equity)
+        self.borrow      = cfg.get("borrow", 0.0)           # annual borrow fee of short positions
+        self.stop_loss   = cfg.get("stop_loss", 0.0)        # fraction from the entry price (0 disables)
+        self.take_profit = cfg.get("take_profit", 0.0)
+        self.short       = cfg.get("short", False)
+        self.jit         = cfg.get("jit", True)             # use numba when installed
+
+    def simulate(self, close, S):
+        """
+        Positions, strategy returns and trades (bars x combinations) of the
+        signals S on the closes, same conventions as GridBacktester.execute.
+        """
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        S     = np.ascontiguousarray(S, dtype=np.int8)
+        args  = (float(self.fees), float(self.slippage), float(self.brokerage)/float(self.capital),
+                 float(self.borrow)/252, float(self.stop_loss), float(self.take_profit), bool(self.short))
+        if self.jit and ExecutionEngine.compiled() is not None:
+            return ExecutionEngine.compiled()(close, S, *args)
+        return simulate_numpy(close, S, *args)
+
+    _compiled = None
+
+    @staticmethod
+    def compiled():
+        # numba version of simulate_loop (numba imported and the loop compiled on first use, None without numba)
+        if ExecutionEngine._compiled is None:
+            try:
+                from numba import njit
+            except ImportError:
+                ExecutionEngine._compiled = False
+            else:
+                ExecutionEngine._compiled = njit(cache=True)(simulate_loop)
+        return ExecutionEngine._compiled or None
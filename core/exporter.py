@@ -1,5 +1,6 @@
-import json
+import os
 import pandas as pd
+from core.config import Config
 from datetime import datetime
 
 
@@ -10,20 +11,63 @@ class Exporter:
     def __init__(self, file_config="config.json"):
         self.load_config(file_config)
 
-    def load_config(self, path):
-        with open(path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            self.end = config.get("end", datetime.now())
+    def load_config(self, config):
+        config   = Config.load(config)
+        cfg      = config.section("export")
+        self.end = config.get("end", datetime.now())
+
+        self.format = cfg.get("format", "excel")       # "excel", "parquet" or "feather"
+        self.top_n  = cfg.get("excel_top_n", 3)        # strategies per ticker in the Excel view (columnar formats)
+        if self.format not in ("excel", "parquet", "feather"):
+            raise ValueError(f"Unsupported export format: {self.format}.")
+
+    @staticmethod
+    def sheet_name(name, used):
+        # unique Excel sheet name (at most 31 characters)
+        base, i = name[:31], 1
+        while base in used:
+            suffix = f"~{i}"
+            base, i = f"{name[:31-len(suffix)]}{suffix}", i +1
+        used.add(base)
+        return base
+
+    def write_frame(self, ticker, label, df):
+        # stream processed data of one combination to data/debug/<ticker>/<indicator>
+        folder = os.path.join("data/debug", ticker)
+        os.makedirs(folder, exist_ok=True)
+        file = os.path.join(folder, f"{label.removeprefix(f'{ticker}_')}.{self.format}")
+        if self.format == "parquet":
+            df.to_parquet(file)
+        else:
+            df.reset_index().to_feather(file)
+
+    def select(self, bst_data):
+        # labels of the Excel view (best strategies of each ticker, columnar formats only)
+        if self.format == "excel" or not self.top_n:
+            return {}
+        return {ticker: list(bst_df.index[:self.top_n]) for ticker, bst_df in bst_data.items()}
         
     def export_dataframe(self, pro_data):
         # export dataframe for further analysis
         for ticker, ticker_debug in pro_data.items():
+            used = set()
             with pd.ExcelWriter(f"data/debug/{ticker}.xlsx", engine="openpyxl") as writer:
-                for sheet_name, df in ticker_debug.items():
+                for label, df in ticker_debug.items():
                     # write to .xlsx
-                    df.to_excel(writer, sheet_name=sheet_name[:20])
+                    df.to_excel(writer, sheet_name=self.sheet_name(label.removeprefix(f"{ticker}_"), used))
 
     def export_results(self, res_data):
+        if self.format != "excel":
+            # export backtesting results (a single table for all tickers)
+            rows = [{"Ticker": ticker, "Label": label, **res, "Parameters": "_".join(str(p) for p in res["Parameters"])}
+                    for ticker, ticker_results in res_data.items() for label, res in ticker_results.items()]
+            df = pd.DataFrame(rows)
+            if self.format == "parquet":
+                df.to_parquet("data/results/results_backtest.parquet", index=False)
+            else:
+                df.to_feather("data/results/results_backtest.feather")
+            return
+        
         # export backtesting results (a spreadsheet for each ticker)
         with pd.ExcelWriter("data/results/results_backtest.xlsx", engine="openpyxl") as writer:
             for ticker, ticker_results in res_data.items():
@@ -33,6 +77,20 @@ class Exporter:
                 # write to .xlsx
                 ticker_results_df.to_excel(writer, sheet_name=ticker[:10], index=False)
 
+    def export_walkforward(self, wf_data):
+        # export walk-forward folds (one row per fold and ticker)
+        df = pd.DataFrame([{"Ticker": ticker, **row} for ticker, rows in wf_data.items() for row in rows])
+        if self.format == "parquet":
+            df.to_parquet("data/results/results_walkforward.parquet", index=False)
+        elif self.format == "feather":
+            df.to_feather("data/results/results_walkforward.feather")
+        else:
+            df.to_excel("data/results/results_walkforward.xlsx", index=False)
+
+    def export_presets(self, df):
+        # export the best strategy of each ticker under each compared preset
+        df.to_csv("data/results/results_presets.csv", index=False)
+
     def export_best_results(self, bst_data):
         # export best results (a spreadsheet for each ticker)
         with pd.ExcelWriter("data/results/results_best.xlsx", engine="openpyxl") as writer:
@@ -1,7 +1,9 @@
-import json
+import os, json, hmac, hashlib, pickle
+from datetime import datetime
 import numpy as np
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.ensemble import RandomForestRegressor
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from core.config import Config
 
 
 # =====================================================
@@ -13,38 +15,82 @@ class Forecaster:
         self.model  = None
         self.load_config(file_config)
         
-    def load_config(self, path):
-        with open(path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            cfg    = config.get("forecast", {})
-            
+    def load_config(self, config):
+        cfg = Config.load(config).section("forecast")
         self.method = cfg.get("method", "RF")
         self.n_lags = cfg.get("lags", 5)
         self.n_estimators = cfg.get("n_estimators", 10)
         self.max_depth = cfg.get("max_depth", 5)
+        self.features = cfg.get("features", [])     # extra features: "returns", "volatility", "volume_ratio"
+        self.dtype = np.float32 if cfg.get("dtype", "float64") == "float32" else np.float64
+
+        unknown = set(self.features) -{"returns", "volatility", "volume_ratio"}
+        if unknown:
+            raise ValueError(f"Unsupported forecast features: {sorted(unknown)}.")
+        if self.n_lags < (2 if self.features else 1):
+            raise ValueError(f"Forecast lags must be >= {2 if self.features else 1}{' with features' if self.features else ''}: {self.n_lags}.")
+
+    def config_hash(self):
+        # hash of the settings that change the fitted model
+        settings = {"method": self.method, "lags": self.n_lags, "n_estimators": self.n_estimators, "max_depth": self.max_depth,
+                    "features": sorted(self.features), "dtype": np.dtype(self.dtype).name}
+        return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def build_features(self):
+        """
+        Feature matrix with one row per window of n_lags samples: row j holds
+        Close[j:j+n_lags] (a strided view, no copy) plus the optional engineered
+        features of the same window. The last row is the input for predict_next.
+        """
+        y = self.df["Close"].to_numpy(dtype=self.dtype)
+        X = sliding_window_view(y, self.n_lags)
+        if not self.features:
+            return X
+
+        extra = []
+        if "returns" in self.features:
+            extra.append(X[:, -1]/X[:, -2] -1)                      # last return of the window
+        if "volatility" in self.features:
+            extra.append((X[:, 1:]/X[:, :-1] -1).std(axis=1))       # volatility of returns in the window
+        if "volume_ratio" in self.features:
+            v = sliding_window_view(self.df["Volume"].to_numpy(dtype=self.dtype), self.n_lags)
+            extra.append(v[:, -1]/v.mean(axis=1))                   # last volume over window mean
+        return np.column_stack([X, *extra]).astype(self.dtype, copy=False)
         
+    def dataset(self):
+        # training set: each window of n_lags closes and the close that follows it
+        X = self.build_features()[:-1]
+        Y = self.df["Close"].to_numpy(dtype=self.dtype)[self.n_lags:]
+        return X, Y
+
+    def fit(self, warm_trees=0):
+        """
+        Fits a new model on the whole history. With warm_trees, a fitted random
+        forest keeps its trees and only warm_trees new trees are fitted on the
+        current history (warm start).
+        """
+        X, Y = self.dataset()
+
+        # train decision trees (scikit-learn is only imported when a model is trained)
+        from sklearn.tree import DecisionTreeRegressor
+        from sklearn.ensemble import RandomForestRegressor
+        if warm_trees and isinstance(self.model, RandomForestRegressor):
+            self.model.set_params(warm_start=True, n_estimators=self.model.n_estimators +warm_trees)
+        elif self.method == "RF":
+            self.model = RandomForestRegressor(n_estimators=self.n_estimators, max_depth=self.max_depth, random_state=0)
+        elif self.method == "DT":
+            self.model = DecisionTreeRegressor(max_depth=self.max_depth)
+        self.model.fit(X, Y)
+        return X
+
     def predictions(self):
         df = self.df
-        y  = df["Close"]
-
-        # build features for ML model
-        X, Y = [], []
-        for i in range(self.n_lags, len(y)):
-            X.append(y.iloc[i-self.n_lags:i])
-            Y.append(y.iloc[i])
-        X = np.array(X)
-        Y = np.array(Y)
-
-        # train decision trees
-        if self.method == "RF":
-            model = RandomForestRegressor(n_estimators=self.n_estimators, max_depth=self.max_depth, random_state=0)
-        elif self.method == "DT":
-            model = DecisionTreeRegressor(max_depth=self.max_depth)
-        model.fit(X, Y)
-        self.model = model
+
+        # build features and train ML model
+        X = self.fit()
 
         # predictions
-        y_hat = model.predict(X)
+        y_hat = self.model.predict(X)
         
         # add to dataframe
         df["Predicted_Close"] = np.nan
@@ -54,6 +100,211 @@ class Forecaster:
     def predict_next(self):
         if self.model is None:
             raise ValueError("No existing model.")
-        last_Y = self.df["Close"].iloc[-self.n_lags:].values.reshape(1, -1)               
+        last_Y = self.build_features()[-1:]
         y_hat  = self.model.predict(last_Y)[0]
-        return y_hat
\ No newline at end of file
+        return y_hat
+
+
+# =====================================================
+#  Forecast cache
+# =====================================================
+class ForecastCache:
+    """
+    Reuses fitted forecasters by ticker. Entries are keyed by a hash of the
+    price data and of the forecast config, kept in memory and persisted to
+    disk (one file per ticker, replaced when either hash changes).
+    """
+    def __init__(self, path="data/models", file_config="config.json"):
+        self.path = path
+        self.config = Config.load(file_config)
+        self.data   = {}
+        self.hits   = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def data_hash(df):
+        return hashlib.sha1(pd.util.hash_pandas_object(df[["Close", "Volume"]]).values.tobytes()).hexdigest()
+
+    def file(self, ticker):
+        return os.path.join(self.path, f"{ticker}.pkl")
+
+    def load(self, ticker, key):
+        if not os.path.exists(self.file(ticker)):
+            return None
+        try:
+            with open(self.file(ticker), "rb") as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None
+        return entry if entry.get("key") == key else None
+
+    def save(self, ticker, entry):
+        tmp = f"{self.file(ticker)}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f)
+        os.replace(tmp, self.file(ticker))
+
+    def get(self, ticker, df):
+        # fitted forecaster for the ticker (trained only when data or config changed)
+        forecaster = Forecaster(df[["Close", "Volume"]], self.config)
+        key = (forecaster.config_hash(), self.data_hash(df))
+
+        entry = self.data.get(ticker)
+        if entry is None or entry["key"] != key:
+            entry = self.load(ticker, key)
+        if entry is None:
+            self.misses += 1
+            forecaster.predictions()
+            entry = {"key": key, "model": forecaster.model, "Predicted_Close": forecaster.df["Predicted_Close"]}
+            self.save(ticker, entry)
+        else:
+            self.hits += 1
+            forecaster.model = entry["model"]
+            forecaster.df["Predicted_Close"] = entry["Predicted_Close"]
+        self.data[ticker] = entry
+        return forecaster
+
+
+# =====================================================
+#  Model registry
+# =====================================================
+class ModelRegistry:
+    """
+    Versioned forecast models published by the optimizer next to
+    strategies.csv (registry folder): one pickle per ticker with the model
+    and the data range, last close and config hash it was trained on (also
+    written as JSON for inspection). The bot reads them from 'source' (a
+    folder or a base URL, like csv_file) and predicts directly. Models from a
+    URL are only unpickled when the HMAC-SHA256 of the pickle matches the
+    signature of the JSON sidecar under the MODEL_KEY secret. A model is
+    retrained when the config, the scikit-learn version or the history it was
+    trained on changed, and refitted (warm start with "warm") after more than
+    max_age new bars. Refits of the bot are kept in a local cache with the
+    published version they derive from and are dropped as soon as a newer
+    version is published.
+    """
+    def __init__(self, file_config="config.json"):
+        self.config = Config.load(file_config)
+        self.status = {}                                # ticker: (status, version, refits) of the last get
+        self.load_config(self.config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("forecast")
+        self.path       = cfg.get("registry", "data/results/models")   # published by the optimizer
+        self.source     = cfg.get("source", "") or self.path            # read by the bot (folder or base URL)
+        self.cache      = cfg.get("cache", "data/state/models")         # refits of the bot
+        self.key        = os.getenv("MODEL_KEY", "").encode()           # signs published models (needed for a URL source)
+        self.max_age    = cfg.get("max_age", 5)         # new bars before a refit
+        self.refit      = cfg.get("refit", "warm")      # "warm" (add trees) or "full"
+        self.warm_trees = cfg.get("warm_trees", 2)
+        self.max_trees  = 2*cfg.get("n_estimators", 10) # warm refits up to this size, then a full one
+
+    @staticmethod
+    def file(path, ticker, ext="pkl"):
+        return os.path.join(path, f"{ticker}.{ext}")
+
+    def load(self, ticker, path=None):
+        # entry of a folder (None when missing or unreadable)
+        try:
+            with open(self.file(path or self.path, ticker), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def sign(self, data):
+        # HMAC-SHA256 of the pickle under MODEL_KEY ("" without a key)
+        return hmac.new(self.key, data, hashlib.sha256).hexdigest() if self.key else ""
+
+    def fetch(self, ticker):
+        # published entry from the source folder or base URL (None when unavailable or not signed with MODEL_KEY)
+        if not self.source.startswith(("http://", "https://")):
+            return self.load(ticker, self.source)
+        if not self.key:
+            return None
+        import requests
+        try:
+            url  = f"{self.source.rstrip('/')}/{ticker}"
+            meta = requests.get(f"{url}.json", timeout=30)
+            meta.raise_for_status()
+            r    = requests.get(f"{url}.pkl", timeout=30)
+            r.raise_for_status()
+            if not hmac.compare_digest(meta.json().get("signature", ""), self.sign(r.content)):
+                return None
+            return pickle.loads(r.content)
+        except Exception:
+            return None
+
+    def save(self, path, ticker, forecaster, version, refits, source):
+        # model and metadata (written atomically, pickle then JSON)
+        import sklearn
+        df    = forecaster.df
+        entry = {
+            "ticker": ticker,
+            "version": version,                         # published version (optimizer)
+            "refits": refits,                           # refits of the bot on top of it
+            "source": source,
+            "trained": datetime.now().isoformat(timespec="seconds"),
+            "config_hash": forecaster.config_hash(),
+            "sklearn": sklearn.__version__,
+            "start": str(df.index[0]),
+            "end": str(df.index[-1]),
+            "bars": len(df),
+            "last_close": float(df["Close"].iloc[-1]),
+            "trees": getattr(forecaster.model, "n_estimators", 1),
+        }
+        data = pickle.dumps({**entry, "model": forecaster.model})
+        meta = {**entry, "sha256": hashlib.sha256(data).hexdigest(), "signature": self.sign(data)}
+        os.makedirs(path, exist_ok=True)
+        for ext, mode, dump in (("pkl", "wb", lambda f: f.write(data)),
+                                ("json", "w", lambda f: json.dump(meta, f, indent=2))):
+            tmp = f"{self.file(path, ticker, ext)}.tmp"
+            with open(tmp, mode) as f:
+                dump(f)
+            os.replace(tmp, self.file(path, ticker, ext))
+        return entry
+
+    def publish(self, ticker, forecaster):
+        # new version of the ticker model (fitted forecaster of the optimizer)
+        entry = self.load(ticker)
+        return self.save(self.path, ticker, forecaster, (entry or {}).get("version", 0) +1, 0, "optimizer")
+
+    def check(self, entry, forecaster):
+        """
+        "fresh", "stale" (more than max_age new bars) or the reason for a full
+        retrain: "missing", "config" (config or scikit-learn version) or
+        "data" (history up to the model end changed, e.g. adjusted prices).
+        """
+        import sklearn
+        if entry is None:
+            return "missing"
+        if entry["config_hash"] != forecaster.config_hash() or entry["sklearn"] != sklearn.__version__:
+            return "config"
+        df  = forecaster.df
+        end = pd.Timestamp(entry["end"])
+        if end not in df.index or not np.isclose(df.at[end, "Close"], entry["last_close"], rtol=1e-6):
+            return "data"
+        return "stale" if (df.index > end).sum() > self.max_age else "fresh"
+
+    def get(self, ticker, df):
+        """
+        Forecaster of the ticker with the newest model: the published one, or
+        the cached refit of the bot while no newer version is published
+        (refitted and cached when stale).
+        """
+        forecaster = Forecaster(df[["Close", "Volume"]], self.config)
+        published  = self.fetch(ticker)
+        cached     = self.load(ticker, self.cache)
+        entry      = cached if cached is not None and cached.get("version", 0) >= (published or {}).get("version", 0) else published
+        status     = self.check(entry, forecaster)
+        version    = (entry or {}).get("version", 0)
+        refits     = (entry or {}).get("refits", 0)
+        if status in ("fresh", "stale"):
+            forecaster.model = entry["model"]
+        if status != "fresh":
+            warm = status == "stale" and self.refit == "warm" and getattr(forecaster.model, "n_estimators", self.max_trees) +self.warm_trees <= self.max_trees
+            forecaster.fit(self.warm_trees if warm else 0)
+            refits += 1
+            self.save(self.cache, ticker, forecaster, version, refits, "bot")
+        self.status[ticker] = (status, version, refits)
+        return forecaster
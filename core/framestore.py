@@ -0,0 +1,75 @@
+import os, shutil
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from core.config import Config
+
+
+# =====================================================
+#  Frame Store
+# =====================================================
+class FrameStore(Mapping):
+    """
+    Processed frames of one ticker, by label, kept until they are exported.
+    Frames are compacted when stored (selected columns, float32 values and
+    int8 signals) and, with spill on, written to a Parquet file right away
+    so that only their labels stay in memory. Reading is lazy (one frame at
+    a time), so Exporter.export_dataframe streams from the store.
+    """
+    INT8 = ("Signal", "Position", "Trade")         # -1/0/1 columns (NaN stored as 0)
+
+    def __init__(self, ticker, file_config="config.json"):
+        self.ticker = ticker
+        self.frames = {}                            # label: frame (in memory) or file (spilled)
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("frames")
+        self.columns  = cfg.get("columns", [])      # columns to keep (empty keeps all)
+        self.downcast = cfg.get("downcast", False)
+        self.spill    = cfg.get("spill", False)
+        self.path     = os.path.join(cfg.get("path", "data/tmp"), self.ticker)
+
+    def compact(self, df):
+        # keep the selected columns and downcast values
+        if self.columns:
+            df = df[[c for c in df.columns if c in self.columns]]
+        if not self.downcast:
+            return df
+        dtypes = {}
+        for col, dtype in df.dtypes.items():
+            if col in self.INT8:
+                dtypes[col] = np.int8
+            elif np.issubdtype(dtype, np.floating):
+                dtypes[col] = np.float32
+            elif np.issubdtype(dtype, np.integer):
+                dtypes[col] = np.int32
+        return df.fillna({col: 0 for col in self.INT8 if col in df}).astype(dtypes)
+
+    def put(self, label, df):
+        df = self.compact(df)
+        if not self.spill:
+            self.frames[label] = df
+            return
+        os.makedirs(self.path, exist_ok=True)
+        file = os.path.join(self.path, f"{label.removeprefix(f'{self.ticker}_')}.parquet")
+        df.to_parquet(file)
+        self.frames[label] = file
+
+    def __getitem__(self, label):
+        frame = self.frames[label]
+        if isinstance(frame, str):
+            return pd.read_parquet(frame)
+        return frame
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def clear(self):
+        # drop frames (and spilled files)
+        self.frames = {}
+        if self.spill:
+            shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,137 @@
+import numpy as np
+from core.config import Config
+from core.indicator import Indicator
+from core.execution import ExecutionEngine
+
+
+# =====================================================
+#  Grid Backtester
+# =====================================================
+class GridBacktester:
+    """
+    Evaluates all indicator combinations of one ticker in a single pass:
+    signals are stacked in a (bars x combos) matrix and positions, trades,
+    returns, drawdown and Sharpe are computed with 2-D array operations,
+    following the same rules as Backtester.run_strategy.
+    """
+    def __init__(self, df, file_config="config.json", cache=None):
+        self.close  = df["Close"]
+        self.volume = df["Volume"]
+        self.cache  = cache
+        self.engine = ExecutionEngine(file_config)
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("backtest")
+        self.ma_v = cfg.get("ma_volume", 10)
+
+    def series(self, key, fn, *args):
+        # indicator values as arrays (shared with the per-combo path through the cache)
+        values = Indicator({}, self.cache).compute(key, fn, self.close, *args)
+        if isinstance(values, tuple):
+            return tuple(v.to_numpy() for v in values)
+        return values.to_numpy()
+
+    def signal(self, indicator, rows=slice(None)):
+        # signal of one combination over the given rows (indicators use the whole history)
+        ind_t  = indicator["ind_t"]
+        params = indicator["ind_p"]
+        close  = self.close.to_numpy(dtype=float)[rows]
+
+        if ind_t in ["SMA", "EMA", "WMA"]:
+            fn = getattr(Indicator, ind_t.lower())
+            ma = [self.series((ind_t, p), fn, p)[rows] for p in params]
+            if len(params) == 1:
+                buy, sell = close > ma[0], close < ma[0]
+            elif len(params) == 2:
+                buy, sell = ma[0] > ma[1], ma[0] < ma[1]
+            elif len(params) == 3:
+                # parameters are given as short, medium, long
+                short, mid, long = ma
+                buy  = (short > mid) & (mid > long)
+                sell = (short < mid) & (mid < long)
+            else:
+                raise ValueError(f"Unsupported parameters for {ind_t}: {params}.")
+        elif ind_t == "BB":
+            window, std_dev = params
+            _, upper, lower = (v[rows] for v in self.series((ind_t, window, std_dev), Indicator.bollinger_bands, window, std_dev))
+            buy, sell = close < lower, close > upper
+        elif ind_t == "MACD":
+            fast, slow, signal = params
+            macd, macd_signal, _ = (v[rows] for v in self.series((ind_t, fast, slow, signal), Indicator.macd, fast, slow, signal))
+            buy, sell = macd > macd_signal, macd < macd_signal
+        else:
+            raise ValueError(f"Unsupported indicator: {ind_t}.")
+        return np.where(sell, -1, np.where(buy, 1, 0)).astype(np.int8)
+
+    def signal_matrix(self, indicators, rows=slice(None)):
+        # buy/sell signals, one column per combination
+        S = np.empty((len(self.close[rows]), len(indicators)), dtype=np.int8)
+        for j, indicator in enumerate(indicators):
+            S[:, j] = self.signal(indicator, rows)
+        return S
+
+    def execute(self, S, rows=slice(None)):
+        # simulate execution (backtest) for all combinations at once (rows: backtest only part of the history)
+        close = self.close.to_numpy(dtype=float)[rows]
+        r = np.full(len(close), np.nan)
+        r[1:] = close[1:]/close[:-1] -1                         # asset percentage variation
+        if self.engine.enabled:
+            # costs, slippage, stops and shorts (path-dependent execution)
+            _, R, T = self.engine.simulate(close, S)
+            self.market, self.strategy, self.trades = r, R, T
+            return r, R, T
+
+        P = np.full(S.shape, np.nan)
+        P[1:] = np.maximum(S[:-1], 0)                           # position from previous sample (long only)
+
+        T = np.full(S.shape, np.nan)
+        T[1:] = np.abs(np.diff(P, axis=0))                      # trades
+
+        R = P*r[:, None]                                        # return of the strategies
+        R[np.isnan(R)] = 0.00001
+        self.market, self.strategy, self.trades = r, R, T
+        return r, R, T
+
+    def metrics(self, rows=slice(None)):
+        """
+        Performance metrics of every combination over the given rows,
+        as arrays with one value per combination.
+        """
+        r, R, T = self.market[rows], self.strategy[rows], self.trades[rows]
+        cum_strategy = np.cumprod(1 +R, axis=0)
+        peak         = np.maximum.accumulate(cum_strategy, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = R.mean(axis=0)/R.std(axis=0, ddof=1)*pow(len(R), 0.5)     # NaN without variance
+        return {
+            "Return_Market": np.nanprod(1 +r) if not np.isnan(r[-1]) else np.nan,
+            "Return_Strategy": cum_strategy[-1],
+            "Trades": np.nansum(T, axis=0)//2,
+            "Sharpe": sharpe,
+            "Max_Drawdown": np.abs(((cum_strategy -peak)/peak).min(axis=0)),
+        }
+
+    def run(self, ticker, indicators):
+        # results in the same layout as res_data[ticker] in the optimizer
+        self.execute(self.signal_matrix(indicators))
+        return self.results(ticker, indicators, self.metrics())
+
+    @staticmethod
+    def results(ticker, indicators, m):
+        # metrics arrays to res_data[ticker] entries
+        res = {}
+        for j, indicator in enumerate(indicators):
+            ind_t  = indicator["ind_t"]
+            ind_p  = indicator["ind_p"]
+            params = "_".join(str(p) for p in ind_p)
+            res[f"{ticker}_{ind_t}_{params}"] = {
+                "Indicator": ind_t,
+                "Parameters": ind_p,
+                "Return_Market": float(m["Return_Market"]),
+                "Return_Strategy": float(m["Return_Strategy"][j]),
+                "Trades": float(m["Trades"][j]),
+                "Sharpe": float(m["Sharpe"][j]),
+                "Max_Drawdown": float(m["Max_Drawdown"][j]),
+                "Score": 0
+            }
+        return res
@@ -0,0 +1,168 @@
+import os, json, hashlib
+import numpy as np
+from core.config import Config
+from core.backtester import Backtester
+from core.grid import GridBacktester
+from core.online import OnlineIndicator
+
+
+# =====================================================
+#  Incremental Backtester
+# =====================================================
+class IncrementalBacktester:
+    """
+    Backtest of all indicator combinations of one ticker kept as a compact
+    state between runs: online indicator states, last signal, cumulative
+    market/strategy returns, peak, max drawdown, trades and the running
+    mean/variance of the strategy returns (for Sharpe). New bars are appended
+    without replaying the history; the state is rebuilt from scratch only
+    when the indicators, the backtest config or the already processed
+    history change.
+    """
+    IGNORED = ("engine", "state", "top_k", "compare", "preset")     # backtest keys that do not change the state
+
+    def __init__(self, ticker, indicators, file_config="config.json", path=None):
+        self.ticker     = ticker
+        self.indicators = indicators
+        self.rebuilds   = 0
+        self.load_config(file_config)
+        self.path       = path or self.path
+        os.makedirs(self.path, exist_ok=True)
+        self.reset()
+
+    def load_config(self, config):
+        config = Config.load(config)
+        cfg    = config.section("backtest")
+        self.path     = cfg.get("state", "data/state/backtest")
+        settings      = {"backtest": {k: v for k, v in cfg.items() if k not in self.IGNORED},
+                         "execution": config.section("execution")}
+        self.settings = hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    def file(self):
+        return os.path.join(self.path, f"{self.ticker}.json")
+
+    @staticmethod
+    def data_hash(close):
+        return hashlib.sha1(np.ascontiguousarray(close, dtype=float).tobytes()).hexdigest()
+
+    def reset(self):
+        m = len(self.indicators)
+        self.online     = [OnlineIndicator(indicator) for indicator in self.indicators]
+        self.n          = 0                         # processed bars
+        self.last_close = np.nan
+        self.hash       = self.data_hash([])        # hash of the processed closes
+        self.market     = 1.0                       # cumulative market return
+        self.signal     = np.full(m, np.nan)        # last signal (NaN before the first bar)
+        self.position   = np.full(m, np.nan)        # last position
+        self.cum        = np.ones(m)                # cumulative strategy return
+        self.peak       = np.ones(m)                # running peak of cum
+        self.drawdown   = np.zeros(m)               # minimum drawdown (negative)
+        self.trades     = np.zeros(m)               # cumulative trades
+        self.mean       = np.zeros(m)               # running mean of strategy returns
+        self.m2         = np.zeros(m)               # running sum of squared deviations
+
+    def load(self):
+        if not os.path.exists(self.file()):
+            return
+        with open(self.file(), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("indicators") != self.indicators or state.get("settings") != self.settings:
+            return
+        self.online     = [OnlineIndicator(ind, st) for ind, st in zip(self.indicators, state["online"])]
+        self.n          = state["n"]
+        self.last_close = state["last_close"]
+        self.hash       = state["hash"]
+        self.market     = state["market"]
+        for name in ("signal", "position", "cum", "peak", "drawdown", "trades", "mean", "m2"):
+            setattr(self, name, np.array(state[name], dtype=float))
+
+    def save(self):
+        state = {
+            "indicators": self.indicators,
+            "settings": self.settings,
+            "online": [online.state() for online in self.online],
+            "n": self.n, "last_close": self.last_close, "hash": self.hash, "market": self.market,
+            **{name: getattr(self, name).tolist() for name in ("signal", "position", "cum", "peak", "drawdown", "trades", "mean", "m2")},
+        }
+        tmp = f"{self.file()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.file())
+
+    def advance(self, x):
+        """
+        Appends the closes 'x' to every combination at once: signals of the
+        new bars, positions from the previous signal (long only) and the
+        metric accumulators, same rules as Backtester.run_strategy.
+        """
+        values = [online.update(x) for online in self.online]
+        S      = np.column_stack([Backtester.signal_rule(ind, x, v) for ind, v in zip(self.indicators, values)])
+
+        # positions and trades (the first bar of the history has no position)
+        prev = np.vstack([self.signal, S[:-1]])
+        P    = np.maximum(prev, 0)
+        T    = np.abs(np.diff(np.vstack([self.position, P]), axis=0))
+
+        # asset and strategy returns
+        r = np.diff(np.concatenate(([self.last_close], x)))/np.concatenate(([self.last_close], x[:-1]))
+        R = P*r[:, None]
+        R[np.isnan(R)] = 0.00001
+
+        # cumulative returns, peak and drawdown (sequential products, same rounding as cumprod)
+        cum  = np.cumprod(np.vstack([self.cum, 1 +R]), axis=0)[1:]
+        peak = np.maximum.accumulate(np.vstack([self.peak, cum]), axis=0)[1:]
+        dd   = (cum -peak)/peak
+        self.drawdown = np.minimum(self.drawdown, dd.min(axis=0))
+        self.cum, self.peak = cum[-1], peak[-1]
+        market = np.cumprod(np.concatenate(([self.market], 1 +np.nan_to_num(r))))[1:]
+        self.market = float(market[-1])
+
+        # per-bar columns of the appended bars (chunked frames, see IntradayBacktester.frames)
+        self.bars = {"values": values, "Signal": S, "Position": P, "Trade": T, "Return": r, "Strategy": R,
+                     "Cumulative_Market": np.where(np.isnan(r), np.nan, market), "Cumulative_Strategy": cum, "Drawdown": dd}
+        self.trades = self.trades +np.nansum(T, axis=0)
+
+        # running mean and variance (chunk merge of Welford accumulators)
+        k     = len(x)
+        mean  = R.mean(axis=0)
+        m2    = ((R -mean)**2).sum(axis=0)
+        delta = mean -self.mean
+        total = self.n +k
+        self.m2   = self.m2 +m2 +delta**2*self.n*k/total
+        self.mean = self.mean +delta*k/total
+
+        self.n          = total
+        self.signal     = S[-1].astype(float)
+        self.position   = P[-1]
+        self.last_close = float(x[-1])
+        return S
+
+    def sync(self, df):
+        # process new bars only (full rebuild when the stored state does not fit the data)
+        self.load()
+        close = df["Close"].to_numpy(dtype=float)
+        if self.n > len(close) or self.data_hash(close[:self.n]) != self.hash:
+            self.reset()
+            self.rebuilds += 1
+
+        if self.n < len(close):
+            self.advance(close[self.n:])
+            self.hash = self.data_hash(close)
+            self.save()
+
+    def metrics(self):
+        # metrics of every combination, same as GridBacktester.metrics
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = self.mean/np.sqrt(self.m2/(self.n -1))*pow(self.n, 0.5)
+        return {
+            "Return_Market": self.market if self.n > 1 else np.nan,
+            "Return_Strategy": self.cum,
+            "Trades": self.trades//2,
+            "Sharpe": sharpe,
+            "Max_Drawdown": np.abs(self.drawdown),
+        }
+
+    def run(self, df):
+        # results in the same layout as res_data[ticker] in the optimizer
+        self.sync(df)
+        return GridBacktester.results(self.ticker, self.indicators, self.metrics())
@@ -1,45 +1,79 @@
 import pandas as pd
+from core.kernels import Kernel
+
+
+# =====================================================
+#  Indicator cache
+# =====================================================
+class IndicatorCache:
+    """
+    Per-ticker memo of indicator series keyed by (type, window, params),
+    shared by all parameter combinations of the same ticker.
+    """
+    def __init__(self):
+        self.data   = {}
+        self.hits   = 0
+        self.misses = 0
+
+    def get(self, key, fn, *args):
+        if key in self.data:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.data[key] = fn(*args)
+        return self.data[key]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.data)}
 
 
 # =====================================================
 #  Indicator
 # =====================================================
 class Indicator:
-    def __init__(self, indicator):
+    def __init__(self, indicator, cache=None):
         self.indicator = indicator
+        self.cache = cache
+
+    def compute(self, key, fn, *args):
+        # compute indicator (or reuse it from the ticker cache)
+        if self.cache is None:
+            return fn(*args)
+        return self.cache.get(key, fn, *args)
 
     @staticmethod
     def sma(series:pd.Series, window:int) -> pd.Series:
         # simple moving average (SMA)
-        return series.rolling(window=window).mean()
+        return pd.Series(Kernel.sma(series.to_numpy(dtype=float), window), index=series.index)
 
     @staticmethod
     def wma(series:pd.Series, window:int) -> pd.Series:
         # weighted moving average (WMA)
-        w      = pd.Series(range(1, window+1), dtype=float)
-        return series.rolling(window=window).apply(lambda x: (x*w).sum()/w.sum(), raw=True)
+        return pd.Series(Kernel.wma(series.to_numpy(dtype=float), window), index=series.index)
 
     @staticmethod
     def ema(series:pd.Series, window:int) -> pd.Series:
         # exponential moving average (EMA)
-        return series.ewm(span=window, adjust=False).mean()
+        return pd.Series(Kernel.ema(series.to_numpy(dtype=float), window), index=series.index)
         
     @staticmethod
     def bollinger_bands(series:pd.Series, window:int, std_dev:float=2.0):
         # bollinger bands (BB)
-        middle = series.rolling(window=window).mean()
-        std    = series.rolling(window=window).std()
+        x      = series.to_numpy(dtype=float)
+        middle = Kernel.sma(x, window)
+        std    = Kernel.std(x, window)
         upper  = middle +(std_dev*std)
         lower  = middle -(std_dev*std)
-        return middle, upper, lower
+        return tuple(pd.Series(v, index=series.index) for v in (middle, upper, lower))
     
     @staticmethod
     def macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
         # moving average convergence divergence (MACD)
-        macd_line   = series.ewm(span=fast, adjust=False).mean() -series.ewm(span=slow, adjust=False).mean()
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        x           = series.to_numpy(dtype=float)
+        macd_line   = Kernel.ema(x, fast) -Kernel.ema(x, slow)
+        signal_line = Kernel.ema(macd_line, signal)
         histogram   = macd_line -signal_line
-        return macd_line, signal_line, histogram
+        return tuple(pd.Series(v, index=series.index) for v in (macd_line, signal_line, histogram))
         
     def setup_indicator(self, df):
         """
@@ -48,6 +82,7 @@ class Indicator:
         - indicator: dictionary with
             - ind_t: str with indicator name ("SMA", "WMA", "EMA" or "BB")
             - ind_p: list with indicator values (10, 20)
+        - cache (optional): IndicatorCache of the ticker, to reuse series across combinations
         """
         df     = df.copy()
         ind_t  = self.indicator.get("ind_t", "")
@@ -58,24 +93,24 @@ class Indicator:
             # 1 MA
             if len(params) == 1:
                 short = params[0]
-                df["Short"] = fn(df["Close"], short)
+                df["Short"] = self.compute((ind_t, short), fn, df["Close"], short)
             # 2 MAs
             elif len(params) == 2:
                 short, long = params
-                df["Short"] = fn(df["Close"], short)
-                df["Long"]  = fn(df["Close"], long)
+                df["Short"] = self.compute((ind_t, short), fn, df["Close"], short)
+                df["Long"]  = self.compute((ind_t, long), fn, df["Close"], long)
             # 3 MAs
             elif len(params) == 3:
                 short, medium, long = params
-                df["Short"] = fn(df["Close"], short)
-                df["Mid"]   = fn(df["Close"], medium)
-                df["Long"]  = fn(df["Close"], long)
+                df["Short"] = self.compute((ind_t, short), fn, df["Close"], short)
+                df["Mid"]   = self.compute((ind_t, medium), fn, df["Close"], medium)
+                df["Long"]  = self.compute((ind_t, long), fn, df["Close"], long)
         elif ind_t == "BB":
             window, std_dev = params
-            df["BB_Mid"], df["BB_Upper"], df["BB_Lower"] = self.bollinger_bands(df["Close"], window, std_dev)
+            df["BB_Mid"], df["BB_Upper"], df["BB_Lower"] = self.compute((ind_t, window, std_dev), self.bollinger_bands, df["Close"], window, std_dev)
         elif ind_t == "MACD":
             fast, slow, signal = params
-            df["MACD"], df["MACD_Signal"], df["MACD_Histogram"] = self.macd(df["Close"], fast, slow, signal)
+            df["MACD"], df["MACD_Signal"], df["MACD_Histogram"] = self.compute((ind_t, fast, slow, signal), self.macd, df["Close"], fast, slow, signal)
         else:
             raise ValueError(f"Unsupported indicator: {ind_t}.")    
         return df
\ No newline at end of file
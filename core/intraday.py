@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pandas as pd
+from core.config import Config
+from core.bars import BarStore
+from core.grid import GridBacktester
+from core.incremental import IncrementalBacktester
+
+
+# =====================================================
+#  Intraday Backtester
+# =====================================================
+class IntradayBacktester:
+    """
+    Backtests over a BarStore in chunks of bars, so memory is bounded by the
+    chunk size and not by the history. The state carried across chunks is
+    the IncrementalBacktester state (rolling window tails and EMA values of
+    the online indicators, last signal and position, cumulative returns,
+    peaks, drawdown, trades and running mean/variance), so results match a
+    run over the whole history at once. The state is saved after each run
+    and later runs only process the bars appended since.
+    """
+    def __init__(self, ticker, indicators, file_config="config.json"):
+        self.ticker     = ticker
+        self.indicators = indicators
+        self.bars       = BarStore(ticker, file_config)
+        self.config     = file_config
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("intraday")
+        self.state = os.path.join(cfg.get("state", "data/state/intraday"), self.bars.interval)
+
+    def sync(self):
+        # advance the stored state over the new bars (rebuilt when the stored bars no longer match it)
+        backtester = IncrementalBacktester(self.ticker, self.indicators, self.config, self.state)
+        backtester.load()
+        close = self.bars.column("Close")
+        if backtester.n > len(close) or (backtester.n and close[backtester.n -1] != backtester.last_close):
+            backtester.reset()
+            backtester.rebuilds += 1
+
+        if backtester.n < len(close):
+            for _, x, _ in self.bars.chunks(backtester.n):
+                backtester.advance(np.asarray(x, dtype=float))
+            backtester.save()
+        return backtester
+
+    def run(self):
+        # results in the same layout as res_data[ticker] in the optimizer
+        if len(self.bars) < 2:
+            raise ValueError(f"Not enough {self.bars.interval} bars stored for {self.ticker}.")
+        m = self.sync().metrics()
+        m["Return_Market"] = np.atleast_1d(m["Return_Market"])[0]
+        return GridBacktester.results(self.ticker, self.indicators, m)
+
+    def frames(self, indicator):
+        """
+        Processed data of one combination, one dataframe per chunk (indicator
+        and backtest columns, same names as the frame engine).
+        """
+        backtester = IncrementalBacktester(self.ticker, [indicator], self.config, self.state)   # in memory only
+        for dates, x, volume in self.bars.chunks():
+            backtester.advance(np.asarray(x, dtype=float))
+            bars = backtester.bars
+            df   = pd.DataFrame({"Close": x, "Volume": volume, **bars["values"][0]}, index=pd.DatetimeIndex(np.asarray(dates), name="Date"))
+            for name in ("Signal", "Position", "Trade", "Strategy", "Cumulative_Strategy", "Drawdown"):
+                df[name] = bars[name][:, 0]
+            df["Return"] = bars["Return"]
+            df["Cumulative_Market"] = bars["Cumulative_Market"]
+            yield df
+
+    def export(self, label, indicator, folder="data/debug"):
+        # stream the processed data of one combination to a Parquet file (one row group per chunk)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        folder = os.path.join(folder, self.ticker)
+        os.makedirs(folder, exist_ok=True)
+        file   = os.path.join(folder, f"{self.bars.interval}_{label.removeprefix(f'{self.ticker}_')}.parquet")
+        writer = None
+        for df in self.frames(indicator):
+            table  = pa.Table.from_pandas(df)
+            writer = writer or pq.ParquetWriter(file, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+        return file
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# =====================================================
+#  Kernel
+# =====================================================
+class Kernel:
+    """
+    Vectorized indicator kernels over 1-D NumPy arrays.
+    Outputs have the same length as the input, with NaN where the
+    window is not yet complete (same convention as pandas rolling).
+    """
+    @staticmethod
+    def _valid(x:np.ndarray, window:int, values:np.ndarray) -> np.ndarray:
+        # pad the 'valid' part of a window operation back to the input length
+        out = np.full(len(x), np.nan)
+        if len(x) >= window:
+            out[window-1:] = values
+        return out
+
+    @staticmethod
+    def sma(x:np.ndarray, window:int) -> np.ndarray:
+        # simple moving average (SMA)
+        if len(x) < window:
+            return np.full(len(x), np.nan)
+        return Kernel._valid(x, window, np.convolve(x, np.ones(window), "valid")/window)
+
+    @staticmethod
+    def wma(x:np.ndarray, window:int) -> np.ndarray:
+        # weighted moving average (WMA), linear weights 1..window (newest weighs more)
+        if len(x) < window:
+            return np.full(len(x), np.nan)
+        w = np.arange(1, window+1, dtype=float)
+        return Kernel._valid(x, window, np.convolve(x, w[::-1], "valid")/w.sum())
+
+    @staticmethod
+    def std(x:np.ndarray, window:int, ddof:int=1) -> np.ndarray:
+        # rolling standard deviation (two-pass over each window)
+        if len(x) < window:
+            return np.full(len(x), np.nan)
+        return Kernel._valid(x, window, sliding_window_view(x, window).std(axis=1, ddof=ddof))
+
+    @staticmethod
+    def ema(x:np.ndarray, window:int, init:float=None) -> np.ndarray:
+        """
+        Exponential moving average (EMA), same as pandas ewm(span=window, adjust=False).
+        'init' is the EMA of the bar before x, to continue a series chunk by chunk.
+        """
+        out   = np.full(len(x), np.nan)
+        valid = np.flatnonzero(~np.isnan(x))
+        if len(valid) == 0:
+            return out
+        
+        first = valid[0]
+        if len(valid) != len(x) -first or (init is not None and first > 0):
+            if init is not None:
+                raise ValueError("Missing values are not supported when continuing an EMA.")
+            # gaps inside the series follow pandas rules for missing values
+            return pd.Series(x).ewm(span=window, adjust=False).mean().to_numpy()
+        
+        from scipy.signal import lfilter
+        alpha = 2/(window +1)
+        prev  = x[first] if init is None else init
+        out[first:], _ = lfilter([alpha], [1, alpha -1], x[first:], zi=[(1 -alpha)*prev])
+        return out
@@ -1,23 +1,37 @@
-import json
-import yfinance as yf
 from datetime import datetime
+import pandas as pd
+from core.config import Config
+from core.provider import PROVIDERS, FileProvider
+from core.store import Store
+from core.bars import BarStore
 
 
 # =====================================================
 #  Loader
 # =====================================================
 class Loader:
-    def __init__(self, file_config="config.json", file_tickers=None, file_indicators=None, market="BR"):
+    def __init__(self, file_config="config.json", file_tickers=None, file_indicators=None, market="BR", provider=None):
         self.file_tickers = file_tickers
         self.file_indicators = file_indicators
         self.market = market
         self.load_config(file_config)
+        if provider is not None:
+            self.provider = provider
            
-    def load_config(self, path):
-        with open(path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            self.start = config.get("start", "2024-01-01")
-            self.end = config.get("end", datetime.now())
+    def load_config(self, config):
+        config = Config.load(config)
+        cfg    = config.section("data")
+        self.config = config
+        self.start = config.get("start", "2024-01-01")
+        self.end = config.get("end", datetime.now())
+
+        # data provider and local price store
+        name = cfg.get("provider", "yahoo")
+        if name not in PROVIDERS:
+            raise ValueError(f"Unsupported data provider: {name}.")
+        self.provider = PROVIDERS[name](cfg.get("source", "data/source")) if name == "file" else PROVIDERS[name]()
+        self.store = Store(cfg.get("path", "data/store")) if cfg.get("store", False) else None
+        self.workers = cfg.get("workers", 8)
         
     def load_tickers(self):
         with open(self.file_tickers, "r", encoding="utf-8") as f:
@@ -35,6 +49,24 @@ class Loader:
                     indicators.append({"ind_t":ind_t, "ind_p":ind_p})
         return indicators
 
+    def load_space(self, file_space):
+        """
+        Search space specs, one indicator per line with a range per
+        parameter: 'SMA,3..30,10..200' (optional step: '10..200:5').
+        """
+        space = []
+        with open(file_space, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    parts  = [p.strip() for p in line.split(",") if p.strip()]
+                    ranges = []
+                    for part in parts[1:]:
+                        bounds, _, step = part.partition(":")
+                        low, _, high    = bounds.partition("..")
+                        ranges.append((int(low), int(high or low), int(step or 1)))
+                    space.append({"ind_t": parts[0], "ranges": ranges})
+        return space
+
     def load_confirmations(self):
         return [
             {"ind_t": "SMA", "ind_p": [5]},
@@ -51,11 +83,97 @@ class Loader:
         return ticker
 
     def download_data(self, ticker):
-        # collect OHLCVDS data from Yahoo Finance
+        # collect Close/Volume data (only the missing range when the store is enabled)
+        symbol = self.format_ticker(ticker)
         try:
-            df = yf.download(self.format_ticker(ticker), self.start, self.end, auto_adjust=True)
+            if self.store is None:
+                return self.provider.fetch(symbol, self.start, self.end)
+            
+            for start, end in self.store.missing(ticker, self.start, self.end):
+                new = self.provider.fetch(symbol, start, end)
+                if self.store.revised(ticker, new):
+                    # stored history no longer matches the provider (e.g. split): fetch it whole
+                    self.store.clear(ticker)
+                    self.store.append(ticker, self.provider.fetch(symbol, self.start, self.end), self.start, self.end)
+                    break
+                self.store.append(ticker, new, start, end)
+            df = self.store.read(ticker, self.start, self.end)
         except Exception as err:
             raise RuntimeError("Unexpected error in download_data.") from err
-        df.columns = df.columns.droplevel(1)    
-        df = df[["Close", "Volume"]]
-        return df
\ No newline at end of file
+        return df
+
+
+    def download_many(self, tickers):
+        """
+        Collect Close/Volume data for several tickers at once.
+        Returns a dictionary of dataframes and a dictionary of errors, both by ticker.
+        """
+        symbols = {ticker: self.format_ticker(ticker) for ticker in tickers}
+        data, errors = {}, {}
+
+        # group tickers sharing the same missing range into one batched request
+        groups = {}
+        for ticker in tickers:
+            ranges = [(self.start, self.end)] if self.store is None else self.store.missing(ticker, self.start, self.end)
+            for rng in ranges:
+                groups.setdefault(rng, []).append(ticker)
+
+        revised = []
+        for (start, end), group in groups.items():
+            fetched, failed = self.provider.fetch_many([symbols[t] for t in group], start, end, self.workers)
+            for ticker in group:
+                if symbols[ticker] in failed:
+                    errors[ticker] = RuntimeError(f"Unexpected error in download_many: {failed[symbols[ticker]]}")
+                elif self.store is None:
+                    data[ticker] = fetched[symbols[ticker]]
+                elif ticker in revised:
+                    continue
+                elif self.store.revised(ticker, fetched[symbols[ticker]]):
+                    revised.append(ticker)
+                else:
+                    self.store.append(ticker, fetched[symbols[ticker]], start, end)
+
+        # stored history no longer matches the provider (e.g. split): fetch it whole
+        if revised:
+            fetched, failed = self.provider.fetch_many([symbols[t] for t in revised], self.start, self.end, self.workers)
+            for ticker in revised:
+                self.store.clear(ticker)
+                if symbols[ticker] in failed:
+                    errors[ticker] = RuntimeError(f"Unexpected error in download_many: {failed[symbols[ticker]]}")
+                else:
+                    self.store.append(ticker, fetched[symbols[ticker]], self.start, self.end)
+
+        if self.store is not None:
+            for ticker in tickers:
+                if ticker not in errors:
+                    data[ticker] = self.store.read(ticker, self.start, self.end)
+        return data, errors
+
+    def download_bars(self, tickers):
+        """
+        Append the new bars (intraday section interval) of several tickers to
+        their bar stores. Source files are ingested chunk by chunk, other
+        providers are asked only for the range after the last stored bar
+        (never before the history they serve for the interval). Stores with
+        fewer than intraday.min_bars bars are reported as errors.
+        Returns a dictionary of BarStore and a dictionary of errors, both by ticker.
+        """
+        data, errors = {}, {}
+        min_bars = self.config.section("intraday").get("min_bars", 100)
+        for ticker in tickers:
+            symbol = self.format_ticker(ticker)
+            bars   = BarStore(ticker, self.config)
+            try:
+                if isinstance(self.provider, FileProvider):
+                    bars.ingest(self.provider.source(symbol, bars.interval), self.start, self.end)
+                else:
+                    start = max(d for d in (pd.Timestamp(self.start), bars.last(), self.provider.earliest(bars.interval)) if d is not None)
+                    bars.append(self.provider.fetch(symbol, start, self.end, bars.interval))
+            except Exception as err:
+                errors[ticker] = RuntimeError(f"Unexpected error in download_bars: {err}")
+                continue
+            if len(bars) < min_bars:
+                errors[ticker] = ValueError(f"Only {len(bars)} {bars.interval} bars stored for {ticker} (intraday.min_bars is {min_bars}).")
+                continue
+            data[ticker] = bars
+        return data, errors
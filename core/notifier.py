@@ -1,26 +1,158 @@
-import os, requests
+import os, time, threading, requests
+from collections import deque
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from core.config import Config
 
 
 # =====================================================
 #  Notifier
 # =====================================================
 class Notifier:
-    def __init__(self):
+    """
+    Telegram delivery through a pooled HTTP session. Sends are throttled per
+    chat (minimum interval and messages per minute), retried with backoff on
+    network errors, 5xx and 429 (honouring 'retry_after'), and can be queued
+    and merged into fewer messages. Metrics are available in stats().
+    """
+    def __init__(self, file_config="config.json", base_url="https://api.telegram.org"):
         load_dotenv()
         self.TOKEN    = os.getenv("TOKEN")      # bot TOKEN
         self.CHAT_ID  = os.getenv("CHAT_ID")    # channel ID
+        self.base_url = base_url
+        self.load_config(file_config)
+
+        # pooled session (shared by the bot threads)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.pool))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=self.pool))
+
+        # per chat send history (rate limits), queue and metrics
+        self.lock    = threading.Lock()
+        self.history = {}
+        self.queue   = []
+        self.latency = []
+        self.sent    = 0
+        self.retries = 0
+        self.dropped = 0
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("notifier")
+        self.interval   = cfg.get("interval", 1.0)      # seconds between messages to the same chat
+        self.per_minute = cfg.get("per_minute", 20)     # messages per minute to the same chat
+        self.max_retry  = cfg.get("retries", 3)
+        self.backoff    = cfg.get("backoff", 1.0)       # first retry delay, doubled on each attempt
+        self.merge      = cfg.get("merge", False)       # merge queued alerts into fewer messages
+        self.max_length = cfg.get("max_length", 4096)   # Telegram message limit
+        self.pool       = cfg.get("pool", 4)
+
+    def throttle(self, chat_id):
+        # wait for a free slot of the chat, respecting interval and messages per minute
+        while True:
+            with self.lock:
+                now  = time.monotonic()
+                sent = self.history.setdefault(chat_id, deque())
+                while sent and now -sent[0] >= 60:
+                    sent.popleft()
+                wait = 0.0
+                if sent:
+                    wait = max(wait, sent[-1] +self.interval -now)
+                if len(sent) >= self.per_minute:
+                    wait = max(wait, sent[0] +60 -now)
+                if wait <= 0:
+                    sent.append(now)
+                    return
+            time.sleep(wait)
+
+    def request(self, method, payload):
+        url = f"{self.base_url}/bot{self.TOKEN}/{method}"
+        for attempt in range(self.max_retry +1):
+            self.throttle(payload.get("chat_id"))
+            start = time.perf_counter()
+            try:
+                r = self.session.post(url, json=payload, timeout=10)
+            except requests.RequestException as err:
+                error, delay = err, self.backoff*2**attempt
+            else:
+                with self.lock:
+                    self.latency.append(time.perf_counter() -start)
+                if r.status_code == 429:
+                    error = requests.HTTPError(f"429 Too Many Requests for url: {url}", response=r)
+                    try:
+                        delay = r.json()["parameters"]["retry_after"]
+                    except (ValueError, KeyError, TypeError):
+                        delay = self.backoff*2**attempt
+                elif r.status_code >= 500:
+                    error, delay = requests.HTTPError(f"{r.status_code} Server Error for url: {url}", response=r), self.backoff*2**attempt
+                elif r.status_code >= 400:
+                    self.count("dropped")
+                    r.raise_for_status()
+                else:
+                    self.count("sent")
+                    return r.json()
+            if attempt < self.max_retry:
+                self.count("retries")
+                time.sleep(delay)
+        self.count("dropped")
+        raise error
+
+    def count(self, metric):
+        # metrics are updated by several sender threads
+        with self.lock:
+            setattr(self, metric, getattr(self, metric) +1)
+
+    def message(self, text):
+        # payload of an HTML message to the channel
+        return {"chat_id": self.CHAT_ID, "text": text, "parse_mode": "HTML", "disable_web_page_preview": True}
 
     def send_telegram(self, payload):
-        url = f"https://api.telegram.org/bot{self.TOKEN}/sendMessage"
-        r = requests.post(url, json=payload, timeout=10)
-        r.raise_for_status()
-        msg_id = r.json()["result"]["message_id"]
+        msg_id = self.request("sendMessage", payload)["result"]["message_id"]
         print("Telegram sent.")
         return msg_id
     
     def pin_telegram(self, payload):
-        url = f"https://api.telegram.org/bot{self.TOKEN}/pinChatMessage"
-        r = requests.post(url, json=payload, timeout=10)
-        r.raise_for_status()
-        print("Telegram pinned.")
\ No newline at end of file
+        self.request("pinChatMessage", payload)
+        print("Telegram pinned.")
+
+    def enqueue(self, key, payload):
+        self.queue.append((key, payload))
+
+    def flush(self):
+        """
+        Sends the queued payloads and returns the message id of each key.
+        When merging, consecutive texts to the same chat (and same options)
+        are joined up to max_length, keys of a merged message share its id.
+        """
+        batches = []
+        for key, payload in self.queue:
+            last = batches[-1] if batches else None
+            options = {k: v for k, v in payload.items() if k != "text"}
+            if (self.merge and last is not None and last[1] == options
+                    and len(last[2]) +2 +len(payload["text"]) <= self.max_length):
+                last[0].append(key)
+                last[2] = f"{last[2]}\n\n{payload['text']}"
+            else:
+                batches.append([[key], options, payload["text"]])
+        self.queue = []
+
+        messages = {}
+        for keys, options, text in batches:
+            try:
+                msg_id = self.send_telegram({**options, "text": text})
+            except Exception as err:
+                print("Telegram error:", err)
+                continue
+            for key in keys:
+                messages[key] = msg_id
+        return messages
+
+    def stats(self):
+        with self.lock:
+            latency = self.latency or [0.0]
+            return {
+                "sent": self.sent,
+                "retries": self.retries,
+                "dropped": self.dropped,
+                "latency_mean": sum(latency)/len(latency),
+                "latency_max": max(latency),
+            }
@@ -0,0 +1,181 @@
+import os, json
+import numpy as np
+from core.config import Config
+from core.kernels import Kernel
+from core.backtester import Backtester
+
+
+# =====================================================
+#  Online Indicator
+# =====================================================
+class OnlineIndicator:
+    """
+    Stateful version of an indicator config. The state is small and JSON
+    serializable (tail of the last window-1 closes and last EMA values), so
+    new bars are processed in time independent of the history length, with
+    the same kernels (and results) as the batch Indicator methods.
+    """
+    def __init__(self, indicator, state=None):
+        self.indicator = indicator
+        self.ind_t     = indicator["ind_t"]
+        self.params    = indicator["ind_p"]
+        if self.ind_t not in ("SMA", "WMA", "EMA", "BB", "MACD"):
+            raise ValueError(f"Unsupported indicator: {self.ind_t}.")
+
+        state = state or {}
+        self.tail = np.asarray(state.get("tail", []), dtype=float)     # last closes needed by rolling windows
+        self.ema  = state.get("ema", {})                                # last EMA values by name
+        self.last = state.get("last", {})                               # last output values
+
+    def state(self):
+        return {"tail": self.tail.tolist(), "ema": self.ema, "last": self.last}
+
+    def window(self):
+        # closes kept between updates
+        if self.ind_t in ("SMA", "WMA"):
+            return max(self.params)
+        if self.ind_t == "BB":
+            return self.params[0]
+        return 1
+
+    def continue_ema(self, name, x, window):
+        out = Kernel.ema(x, window, self.ema.get(name))
+        if len(out) and not np.isnan(out[-1]):
+            self.ema[name] = float(out[-1])
+        return out
+
+    def update(self, x):
+        """
+        Advances the indicator over new closes 'x' (one bar or a chunk).
+        Returns the output columns (setup_indicator names) for those bars.
+        """
+        x = np.asarray(x, dtype=float)
+        z = np.concatenate([self.tail, x])
+        n = len(x)
+
+        if self.ind_t in ("SMA", "WMA"):
+            fn    = Kernel.sma if self.ind_t == "SMA" else Kernel.wma
+            names = {1: ["Short"], 2: ["Short", "Long"], 3: ["Short", "Mid", "Long"]}[len(self.params)]
+            out   = {name: fn(z, p)[len(z)-n:] for name, p in zip(names, self.params)}
+        elif self.ind_t == "EMA":
+            names = {1: ["Short"], 2: ["Short", "Long"], 3: ["Short", "Mid", "Long"]}[len(self.params)]
+            out   = {name: self.continue_ema(name, x, p) for name, p in zip(names, self.params)}
+        elif self.ind_t == "BB":
+            window, std_dev = self.params
+            mid = Kernel.sma(z, window)[len(z)-n:]
+            std = Kernel.std(z, window)[len(z)-n:]
+            out = {"BB_Mid": mid, "BB_Upper": mid +std_dev*std, "BB_Lower": mid -std_dev*std}
+        else:
+            fast, slow, signal = self.params
+            macd = self.continue_ema("fast", x, fast) -self.continue_ema("slow", x, slow)
+            line = self.continue_ema("signal", macd, signal)
+            out  = {"MACD": macd, "MACD_Signal": line, "MACD_Histogram": macd -line}
+
+        self.tail = z[-(self.window() -1):] if self.window() > 1 else z[:0]
+        if n:
+            self.last = {name: float(v[-1]) for name, v in out.items()}
+        return out
+
+
+# =====================================================
+#  Online Engine
+# =====================================================
+class OnlineEngine:
+    """
+    Online indicators of one ticker, persisted between runs. Each sync
+    advances only the bars after the last processed date; the state is
+    rebuilt from the full history when the indicators change or the stored
+    last bar no longer matches the data (revised history). Besides the
+    indicator values, the signal of each indicator is tracked with the rules
+    of run_strategy (last signal, signal length, position and entry price),
+    so the bot never replays the history.
+    """
+    def __init__(self, ticker, indicators, file_config="config.json", path=None):
+        self.ticker     = ticker
+        self.indicators = indicators
+        self.load_config(file_config)
+        self.path       = path or self.path
+        os.makedirs(self.path, exist_ok=True)
+        self.reset()
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("bot")
+        self.path = cfg.get("state", "data/state/indicators")
+
+    def file(self):
+        return os.path.join(self.path, f"{self.ticker}.json")
+
+    def reset(self):
+        self.online     = [OnlineIndicator(indicator) for indicator in self.indicators]
+        self.tracks     = [{"signal": None, "run": 0, "position": None, "entry": None} for _ in self.indicators]
+        self.last_date  = None
+        self.last_close = None
+
+    def load(self):
+        if not os.path.exists(self.file()):
+            return
+        with open(self.file(), "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("indicators") != self.indicators or "tracks" not in state:
+            return
+        self.online     = [OnlineIndicator(ind, st) for ind, st in zip(self.indicators, state["states"])]
+        self.tracks     = state["tracks"]
+        self.last_date  = state["last_date"]
+        self.last_close = state["last_close"]
+
+    def save(self):
+        state = {
+            "indicators": self.indicators,
+            "last_date": self.last_date,
+            "last_close": self.last_close,
+            "states": [online.state() for online in self.online],
+            "tracks": self.tracks,
+        }
+        tmp = f"{self.file()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.file())
+
+    def sync(self, df):
+        # process new bars only (full rebuild when the stored state does not fit the data)
+        self.load()
+        dates = df.index.astype(str)
+        close = df["Close"].to_numpy(dtype=float)
+
+        start = 0
+        if self.last_date is not None:
+            pos = np.flatnonzero(dates == self.last_date)
+            if len(pos) and close[pos[0]] == self.last_close:
+                start = pos[0] +1
+            else:
+                self.reset()
+
+        if start < len(close):
+            x = close[start:]
+            for online, track in zip(self.online, self.tracks):
+                self.track(track, online.indicator, x, online.update(x))
+            self.last_date  = dates[-1]
+            self.last_close = float(close[-1])
+            self.save()
+        return [online.last for online in self.online]
+
+    @staticmethod
+    def track(track, indicator, x, out):
+        # advance the signal state over new closes (position from the previous signal, long only, as run_strategy)
+        for close, signal in zip(x, Backtester.signal_rule(indicator, x, out).tolist()):
+            position = None if track["signal"] is None else max(track["signal"], 0)
+            if position is not None and track["position"] is not None and position != track["position"]:
+                track["entry"] = float(close)
+            track["run"]      = track["run"] +1 if signal == track["signal"] else 1
+            track["signal"]   = signal
+            track["position"] = position
+
+    def status(self, df):
+        # last bar of each indicator: signal, signal length and entry price (run_strategy columns)
+        self.sync(df)
+        return [{"Signal": t["signal"], "Signal_Length": t["run"] if t["signal"] else 0,
+                 "Entry_Price": np.nan if t["entry"] is None else t["entry"]} for t in self.tracks]
+
+    def signals(self, df):
+        # last bar signal of each indicator
+        return [s["Signal"] for s in self.status(df)]
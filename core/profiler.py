@@ -0,0 +1,129 @@
+import os, json, time, threading, tracemalloc, cProfile
+from contextlib import contextmanager
+from core.config import Config
+
+
+# =====================================================
+#  Profiler
+# =====================================================
+class Profiler:
+    """
+    Stage timers of a run. Each 'with profiler.stage(name, ticker=..., combo=...)'
+    records wall time (and the traced peak memory of the stage when memory
+    sampling is on); stages listed in 'cprofile' also dump a cProfile file.
+    Records of worker processes are merged back with 'merge' and the run
+    report is written as JSON (summary + records) and CSV (records).
+    Peak memory comes from tracemalloc, which is process-wide: it is only
+    meaningful while stages of the process run one at a time, so callers
+    with concurrent threads (the async bot) turn it off with memory=False.
+    """
+    def __init__(self, file_config="config.json", enabled=None, memory=None):
+        self.records = []
+        self.local   = threading.local()        # stack of open stages (per thread)
+        self.active  = False                    # a cProfile is running
+        self.start   = time.time()
+        self.load_config(file_config)
+        if enabled is not None:
+            self.enabled = enabled
+        if memory is not None:
+            self.memory = memory
+        if self.enabled and self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("profile")
+        self.enabled  = cfg.get("enabled", False)
+        self.memory   = cfg.get("memory", False)       # traced peak memory per stage (slower)
+        self.cprofile = cfg.get("cprofile", [])        # stage names to profile with cProfile
+        self.path     = cfg.get("path", "data/results")
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    @contextmanager
+    def stage(self, name, ticker=None, combo=None):
+        if not self.enabled:
+            yield
+            return
+
+        # peak memory: the parent keeps the peak seen so far before it is reset for this stage
+        stack  = self.stack()
+        record = {"stage": name, "ticker": ticker, "combo": combo, "peak": 0}
+        if self.memory:
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        stack.append(record)
+
+        profiler = None
+        if name in self.cprofile and not self.active:
+            profiler, self.active = cProfile.Profile(), True
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record["seconds"] = time.perf_counter() -start
+            if profiler:
+                profiler.disable()
+                self.active = False
+                folder = os.path.join(self.path, "profile")
+                os.makedirs(folder, exist_ok=True)
+                profiler.dump_stats(os.path.join(folder, "_".join(str(p) for p in (name, ticker, combo) if p) +".prof"))
+
+            stack.pop()
+            peak = record.pop("peak")
+            if self.memory:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                record["peak_mb"] = peak/2**20
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            self.records.append(record)
+
+    def merge(self, records):
+        # records collected in another process (e.g. run_ticker in the process pool)
+        self.records.extend(records)
+
+    def summary(self):
+        # totals by stage: calls, total, mean and max seconds (and max peak memory)
+        summary = {}
+        for r in self.records:
+            s = summary.setdefault(r["stage"], {"calls": 0, "total": 0.0, "max": 0.0})
+            s["calls"] += 1
+            s["total"] += r["seconds"]
+            s["max"]    = max(s["max"], r["seconds"])
+            if "peak_mb" in r:
+                s["peak_mb"] = max(s.get("peak_mb", 0.0), r["peak_mb"])
+        for s in summary.values():
+            s["mean"] = s["total"]/s["calls"]
+        return summary
+
+    @staticmethod
+    def max_rss():
+        # peak resident memory of the process in MB (None where not available)
+        try:
+            import resource
+        except ImportError:
+            return None
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024
+
+    def export(self, name):
+        # run report: data/results/run_<name>.json and .csv
+        if not self.enabled:
+            return
+        import pandas as pd
+        os.makedirs(self.path, exist_ok=True)
+        report = {
+            "run": name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.start)),
+            "seconds": time.time() -self.start,
+            "max_rss_mb": self.max_rss(),
+            "stages": self.summary(),
+            "records": self.records,
+        }
+        with open(os.path.join(self.path, f"run_{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        pd.DataFrame(self.records).to_csv(os.path.join(self.path, f"run_{name}.csv"), index=False)
@@ -0,0 +1,118 @@
+import os
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+
+# =====================================================
+#  Provider
+# =====================================================
+class Provider:
+    """
+    Base interface for market data sources. Subclasses must return a
+    dataframe indexed by date with columns 'Close' and 'Volume' for the
+    half-open range [start, end) or an empty dataframe when there is no data.
+    The interval is the bar resolution ("1d" daily, "5m" 5-minute, ...).
+    """
+    COLUMNS = ["Close", "Volume"]
+    LOOKBACK = {}                   # days of history served by interval (unlisted: no limit)
+
+    def fetch(self, symbol, start, end, interval="1d"):
+        raise NotImplementedError
+
+    def earliest(self, interval, now=None):
+        # first date the provider serves for the interval (None when there is no limit)
+        days = self.LOOKBACK.get(interval)
+        if days is None:
+            return None
+        return (pd.Timestamp(now or pd.Timestamp.now()) -pd.Timedelta(days=days)).normalize()
+
+    def fetch_many(self, symbols, start, end, workers=8):
+        # fetch several symbols with a bounded thread pool, failures are reported per symbol
+        data, errors = {}, {}
+        def task(symbol):
+            try:
+                return symbol, self.fetch(symbol, start, end), None
+            except Exception as err:
+                return symbol, None, err
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(symbols)))) as pool:
+            for symbol, df, err in pool.map(task, symbols):
+                if err is None:
+                    data[symbol] = df
+                else:
+                    errors[symbol] = err
+        return data, errors
+
+    def empty(self):
+        return pd.DataFrame(columns=self.COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+class YahooProvider(Provider):
+    # intraday bars only cover the last days (1m: 7 days, up to 90m: 60 days, hourly: 730 days)
+    LOOKBACK = {"1m": 6, "2m": 59, "5m": 59, "15m": 59, "30m": 59, "90m": 59, "60m": 729, "1h": 729}
+
+    def fetch(self, symbol, start, end, interval="1d"):
+        # collect OHLCVDS data from Yahoo Finance (intraday intervals only cover the last days)
+        import yfinance as yf
+        df = yf.download(symbol, start, end, auto_adjust=True, interval=interval)
+        if df is None or df.empty:
+            return self.empty()
+        df.columns = df.columns.droplevel(1)
+        return df[self.COLUMNS]
+
+    def fetch_many(self, symbols, start, end, workers=8):
+        # single batched request, split afterwards into one frame per symbol
+        import yfinance as yf
+        data, errors = {}, {}
+        try:
+            df = yf.download(list(symbols), start, end, auto_adjust=True, threads=workers)
+        except Exception as err:
+            return data, {symbol: err for symbol in symbols}
+        
+        for symbol in symbols:
+            if df is None or df.empty or symbol not in df.columns.get_level_values(1):
+                errors[symbol] = ValueError(f"No data returned for {symbol}.")
+                continue
+            sub = df.xs(symbol, axis=1, level=1)[self.COLUMNS].dropna(how="all")
+            if sub.empty:
+                errors[symbol] = ValueError(f"No data returned for {symbol}.")
+                continue
+            data[symbol] = sub
+        return data, errors
+
+
+class FileProvider(Provider):
+    """
+    File-backed provider reading '<symbol>.csv' or '<symbol>.parquet' from a
+    local folder. Used to run the pipeline (and the store) without network.
+    """
+    def __init__(self, path="data/source"):
+        self.path = path
+        self.calls = 0      # number of fetches served (useful to check the store)
+
+    def source(self, symbol, interval="1d"):
+        # source file of the symbol (intraday files in a folder per interval, e.g. data/source/5m)
+        base = os.path.join(self.path, symbol) if interval == "1d" else os.path.join(self.path, interval, symbol)
+        for ext in ("parquet", "csv"):
+            if os.path.exists(f"{base}.{ext}"):
+                return f"{base}.{ext}"
+        raise FileNotFoundError(f"No source file for {symbol} in {os.path.dirname(base)}.")
+
+    def read(self, symbol, interval="1d"):
+        file = self.source(symbol, interval)
+        if file.endswith(".parquet"):
+            df = pd.read_parquet(file)
+        else:
+            df = pd.read_csv(file, index_col=0, parse_dates=True)
+        df.index = pd.DatetimeIndex(df.index, name="Date")
+        return df[self.COLUMNS].sort_index()
+
+    def fetch(self, symbol, start, end, interval="1d"):
+        self.calls += 1
+        df = self.read(symbol, interval)
+        return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+
+PROVIDERS = {
+    "yahoo": YahooProvider,
+    "file":  FileProvider,
+}
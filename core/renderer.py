@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from core.config import Config
+
+
+# =====================================================
+#  Renderer
+# =====================================================
+class Renderer:
+    """
+    Chart stage of the optimizer, run after the strategies are ranked.
+    Charts are limited to the top-N strategies of each ticker, identical
+    charts (e.g. the forecast of a ticker) are rendered only once and
+    rendering runs in a worker pool.
+    """
+    def __init__(self, file_config="config.json", path="data/results"):
+        self.path = path
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("plot")
+        self.enabled = cfg.get("enabled", False)
+        self.top_n   = cfg.get("top_n", 3)          # 0 renders every combination
+        self.dpi     = cfg.get("dpi", 300)
+        self.format  = cfg.get("format", "png")
+        self.workers = cfg.get("workers", 1)
+
+    def select(self, bst_data):
+        # labels to render (best strategies of each ticker)
+        if not self.enabled:
+            return {}
+        return {ticker: list(bst_df.index[:self.top_n] if self.top_n else bst_df.index) for ticker, bst_df in bst_data.items()}
+
+    def jobs(self, label, df):
+        """
+        Charts of one processed dataframe, keyed by output file so that
+        charts shared by several strategies are kept only once.
+        """
+        ticker, ind_t, *params = label.split("_")
+        ind_cols = [c for c in df.columns if c in ("Short", "Mid", "Long", "BB_Mid", "BB_Upper", "BB_Lower", "MACD", "MACD_Signal", "MACD_Histogram")]
+        return {
+            os.path.join(self.path, f"{label}.{self.format}"): ("price", label, df[["Close", *ind_cols]]),
+            os.path.join(self.path, f"{ticker}_forecast.{self.format}"): ("forecast", label, df[["Close", "Predicted_Close"]]),
+            os.path.join(self.path, f"{label}_backtest.{self.format}"): ("backtest", label, df[["Cumulative_Market", "Cumulative_Strategy"]]),
+        }
+
+    def render(self, jobs):
+        tasks = [(file, *job, self.dpi) for file, job in jobs.items()]
+        if self.workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(Renderer.draw, tasks))
+        else:
+            for task in tasks:
+                Renderer.draw(task)
+
+    @staticmethod
+    def plot_price(axis, df, ticker):
+        axis.plot(df.index, df["Close"], label=ticker)
+        axis.grid(True)
+
+    @staticmethod
+    def plot_ma(axis, df, ind_t, params):
+        if "Short" in df and len(params) >= 1:
+            axis.plot(df.index, df["Short"], label=f"{ind_t}{params[0]}")
+        if "Long" in df and len(params) == 2:
+            axis.plot(df.index, df["Long"], label=f"{ind_t}{params[1]}")
+        if "Mid" in df and len(params) >= 3:
+            axis.plot(df.index, df["Mid"], label=f"{ind_t}{params[1]}")
+        if "Long" in df and len(params) >= 3:
+            axis.plot(df.index, df["Long"], label=f"{ind_t}{params[2]}")
+
+    @staticmethod
+    def plot_bb(axis, df, params):
+        axis.plot(df.index, df["BB_Mid"], label=f"BB mean {params[0]}")
+        axis.plot(df.index, df["BB_Upper"], color='r', label=f"BB std {params[1]}")
+        axis.plot(df.index, df["BB_Lower"], color='r')
+
+    @staticmethod
+    def plot_macd(axis, df):
+        axis.plot(df.index, df["MACD"], label="MACD")
+        axis.plot(df.index, df["MACD_Signal"], label="MACD_Signal")
+        axis.bar(df.index, df["MACD_Histogram"], color='r', label="Histogram", alpha=0.4)
+        axis.axhline(0, linewidth=1)
+        axis.grid(True)
+
+    @staticmethod
+    def draw(task):
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        file, kind, label, df, dpi = task
+        ticker, ind_t, *params = label.split("_")
+
+        if kind == "price":
+            # plot price and indicator
+            if ind_t == "MACD":
+                fig, (axis_price, axis_macd) = plt.subplots(2, 1, figsize=(12,8), sharex=True, gridspec_kw={"height_ratios": [3, 1]})
+                Renderer.plot_price(axis_price, df, ticker)
+                axis_price.set_title(f"{ticker} - Price")
+                Renderer.plot_macd(axis_macd, df)
+            else:
+                fig, axis = plt.subplots(figsize=(12,6))
+                Renderer.plot_price(axis, df, ticker)
+                if ind_t == "BB":
+                    Renderer.plot_bb(axis, df, params)
+                else:
+                    Renderer.plot_ma(axis, df, ind_t, params)
+                axis.legend()
+                axis.set_title(f"{ticker} - Price")
+            plt.tight_layout()
+        elif kind == "forecast":
+            # plot predictions
+            plt.figure(figsize=(12,6))
+            plt.plot(df.index, df["Close"], label=f"{ticker}")
+            plt.plot(df.index, df["Predicted_Close"], label="Predictions")
+            plt.title(f"{ticker} - Price")
+            plt.legend()
+            plt.grid(True)
+        elif kind == "backtest":
+            # plot returns
+            plt.figure(figsize=(12,6))
+            plt.plot(df.index, df["Cumulative_Market"], label="Buy & Hold")
+            plt.plot(df.index, df["Cumulative_Strategy"], label="Strategy")
+            plt.title(f"{ticker} - Backtest {ind_t}{'/'.join(params)}")
+            plt.legend()
+            plt.grid(True)
+        plt.savefig(file, dpi=dpi, bbox_inches="tight")
+        plt.close()
@@ -0,0 +1,148 @@
+import math, time, itertools
+import numpy as np
+from core.config import Config
+from core.grid import GridBacktester
+from core.strategies import Strategies
+
+
+# =====================================================
+#  Parameter Search
+# =====================================================
+class ParameterSearch:
+    """
+    Budgeted search over parameter ranges (Loader.load_space) instead of the
+    fixed indicators.txt list. Candidates are evaluated with the grid engine
+    and ranked with the preset score of Strategies:
+    - "halving": successive halving, every candidate starts on the most recent
+      min_bars of history and the best 1/eta move on to eta times more history,
+      up to the whole period.
+    - "refine": coarse-to-fine, a coarse lattice of each range is evaluated on
+      the whole period and the neighbourhood of the top_k is refined with
+      halved steps down to step 1.
+    Candidates are evaluated in batches and the limits are checked after each
+    batch. When the evaluation budget or the time limit is reached, only the
+    candidates already scored are ranked, and at most top_k of them are
+    evaluated on the whole period (the results).
+    """
+    def __init__(self, df, file_config="config.json", cache=None):
+        self.grid       = GridBacktester(df, file_config, cache)
+        self.strategies = Strategies(file_config)
+        self.n          = len(df)
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("search")
+        self.method   = cfg.get("method", "halving")
+        self.budget   = cfg.get("budget", 2000)     # evaluations (in whole-period equivalents)
+        self.time     = cfg.get("time", 60)         # seconds, 0 for no limit
+        self.eta      = cfg.get("eta", 3)
+        self.min_bars = cfg.get("min_bars", 60)
+        self.points   = cfg.get("points", 8)        # coarse points per parameter (refine)
+        self.top_k    = cfg.get("top_k", 5)
+        self.batch    = cfg.get("batch", 256)       # candidates evaluated between budget checks
+        self.seed     = cfg.get("seed", 0)
+        if self.method not in ("halving", "refine"):
+            raise ValueError(f"Unsupported search method: {self.method}.")
+
+    @staticmethod
+    def valid(ind_t, params):
+        # moving averages short < (mid <) long, MACD fast < slow
+        if ind_t in ("SMA", "EMA", "WMA"):
+            return all(a < b for a, b in zip(params, params[1:]))
+        if ind_t == "MACD":
+            return params[0] < params[1]
+        return True
+
+    @staticmethod
+    def candidates(spec, steps=None):
+        # every valid combination of one spec (steps override the spec steps)
+        ranges = [range(low, high +1, step) for (low, high, _), step in zip(spec["ranges"], steps or [r[2] for r in spec["ranges"]])]
+        return [{"ind_t": spec["ind_t"], "ind_p": list(p)} for p in itertools.product(*ranges) if ParameterSearch.valid(spec["ind_t"], p)]
+
+    def evaluate(self, indicators, bars=None):
+        """
+        Metrics and preset score of the candidates over the last 'bars' of
+        history, batch by batch until the budget or time runs out (at least
+        one batch): only the first len(score) candidates were evaluated.
+        """
+        rows  = slice(-bars, None) if bars and bars < self.n else slice(None)
+        parts = []
+        for i in range(0, len(indicators), max(self.batch, 1)):
+            batch = indicators[i:i +max(self.batch, 1)]
+            self.grid.execute(self.grid.signal_matrix(batch, rows), rows)
+            parts.append(self.grid.metrics())
+            self.spent += len(batch)*(bars or self.n)/self.n
+            if self.expired():
+                break
+        if not parts:
+            return {}, np.array([])
+        m = {k: v if np.ndim(v) == 0 else np.concatenate([p[k] for p in parts]) for k, v in parts[0].items()}
+        return m, np.nan_to_num(self.strategies.score(m), nan=-np.inf)
+
+    def expired(self):
+        return self.spent >= self.budget or (self.time and time.perf_counter() -self.start >= self.time)
+
+    def halving(self, space):
+        # rung lengths: min_bars, min_bars*eta, ... up to the whole period
+        K     = max(0, int(math.log(self.n/self.min_bars, self.eta))) if self.n > self.min_bars else 0
+        rungs = [math.ceil(self.n/self.eta**(K -k)) for k in range(K +1)]
+
+        # initial sample that fits the budget (cost of a rung shrinks with its survivors and history)
+        cands = [c for spec in space for c in self.candidates(spec)]
+        n0    = int(self.budget*self.eta**K/(K +1))
+        if len(cands) > n0:
+            rng   = np.random.default_rng(self.seed)
+            cands = [cands[i] for i in sorted(rng.choice(len(cands), n0, replace=False))]
+
+        for bars in rungs[:-1]:
+            if len(cands) <= self.top_k or self.expired():
+                break
+            _, score = self.evaluate(cands, bars)
+            keep     = max(self.top_k, math.ceil(len(cands)/self.eta)) if not self.expired() else self.top_k
+            cands    = [cands[i] for i in np.argsort(-score, kind="stable")[:keep]]     # scored candidates only
+
+        # out of budget: the whole period only for the best survivors
+        if self.expired():
+            cands = cands[:self.top_k]
+        m, score = self.evaluate(cands)
+        return cands[:len(score)], m
+
+    def refine(self, space):
+        # coarse lattice of every spec, then halved steps around the best
+        steps = {spec["ind_t"]: [max(step, math.ceil((high -low)/max(self.points -1, 1))) for low, high, step in spec["ranges"]] for spec in space}
+        specs = {spec["ind_t"]: spec for spec in space}
+        cands = [c for spec in space for c in self.candidates(spec, steps[spec["ind_t"]])]
+        seen  = {}
+
+        while cands:
+            m, score = self.evaluate(cands)
+            for j, c in enumerate(cands[:len(score)]):
+                seen[(c["ind_t"], tuple(c["ind_p"]))] = (c, {k: v if np.ndim(v) == 0 else v[j] for k, v in m.items()}, score[j])
+            if self.expired() or all(s == [r[2] for r in specs[t]["ranges"]] for t, s in steps.items()):
+                break
+
+            # neighbours of the top_k with halved steps (within the ranges of the spec)
+            best  = sorted(seen.values(), key=lambda e: -e[2])[:self.top_k]
+            steps = {t: [max(r[2], s//2) for r, s in zip(specs[t]["ranges"], st)] for t, st in steps.items()}
+            new   = {}
+            for c, _, _ in best:
+                spec   = specs[c["ind_t"]]
+                around = [sorted({min(max(p +d*s, low), high) for d in (-1, 0, 1)}) for p, s, (low, high, _) in zip(c["ind_p"], steps[c["ind_t"]], spec["ranges"])]
+                for p in itertools.product(*around):
+                    key = (c["ind_t"], p)
+                    if key not in seen and ParameterSearch.valid(c["ind_t"], p):
+                        new[key] = {"ind_t": c["ind_t"], "ind_p": list(p)}
+            cands = list(new.values())
+
+        entries = list(seen.values())
+        return [e[0] for e in entries], {k: np.array([e[1][k] for e in entries]) for k in entries[0][1]} if entries else {}
+
+    def run(self, ticker, space):
+        # results of the candidates evaluated on the whole period (res_data[ticker] layout)
+        self.start = time.perf_counter()
+        self.spent = 0.0
+        cands, m   = self.halving(space) if self.method == "halving" else self.refine(space)
+        if m:
+            m["Return_Market"] = np.atleast_1d(m["Return_Market"])[0]
+        self.evaluations = self.spent
+        return self.grid.results(ticker, cands, m)
@@ -0,0 +1,97 @@
+import os, json
+import numpy as np
+import pandas as pd
+
+
+# =====================================================
+#  Store
+# =====================================================
+class Store:
+    """
+    Local columnar price store: one Parquet file per ticker plus a small
+    sidecar with the date range already requested from the provider, so only
+    the missing part of [start, end) has to be fetched again. Refetches
+    overlap the stored bars, so a history revised by the provider (adjusted
+    prices after a split or dividend) is detected and fetched again whole.
+    """
+    def __init__(self, path="data/store"):
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+    def file(self, ticker):
+        return os.path.join(self.path, f"{ticker}.parquet")
+
+    def file_meta(self, ticker):
+        return os.path.join(self.path, f"{ticker}.json")
+
+    def load(self, ticker):
+        if not os.path.exists(self.file(ticker)):
+            return None
+        return pd.read_parquet(self.file(ticker))
+
+    def load_meta(self, ticker):
+        if not os.path.exists(self.file_meta(ticker)):
+            return None
+        with open(self.file_meta(ticker), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"])
+
+    def missing(self, ticker, start, end):
+        # date ranges [start, end) not yet requested from the provider
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        meta = self.load_meta(ticker)
+        df   = self.load(ticker)
+        if meta is None or df is None or df.empty:
+            return [(start, end)]
+        
+        cov_start, cov_end = meta
+        ranges = []
+        if start < cov_start:
+            ranges.append((start, cov_start))
+        if end > cov_end:
+            # fetch again from the bar before the last stored one: the last bar may
+            # have been partial and the one before it is checked for revisions
+            ranges.append((min(df.index[-2] if len(df) > 1 else df.index[-1], cov_end), end))
+        return ranges
+
+    def revised(self, ticker, new):
+        # True when complete stored bars differ from the fetched ones (history re-adjusted by the provider)
+        df = self.load(ticker)
+        if df is None or df.empty or new.empty:
+            return False
+        common = df.index[:-1].intersection(new.index)
+        if common.empty:
+            return False
+        return not np.allclose(df.loc[common, "Close"].to_numpy(dtype=float), new.loc[common, "Close"].to_numpy(dtype=float), rtol=1e-6, equal_nan=True)
+
+    def clear(self, ticker):
+        # drop the stored bars and range of the ticker
+        for file in (self.file(ticker), self.file_meta(ticker)):
+            if os.path.exists(file):
+                os.remove(file)
+
+    def append(self, ticker, new, start, end):
+        # merge new bars (newer values win) and extend the covered range
+        df = self.load(ticker)
+        if df is not None and not df.empty:
+            new = pd.concat([df, new]) if not new.empty else df
+        new = new[~new.index.duplicated(keep="last")].sort_index()
+        new.index.name = "Date"
+
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        meta = self.load_meta(ticker)
+        if meta is not None:
+            start, end = min(start, meta[0]), max(end, meta[1])
+
+        # bars then range, each written to a temporary file and moved over the old one
+        tmp = f"{self.file(ticker)}.tmp"
+        new.to_parquet(tmp)
+        os.replace(tmp, self.file(ticker))
+        tmp = f"{self.file_meta(ticker)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"start": str(start), "end": str(end)}, f)
+        os.replace(tmp, self.file_meta(ticker))
+
+    def read(self, ticker, start, end):
+        df = self.load(ticker)
+        return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
@@ -1,5 +1,7 @@
-import json
+from operator import itemgetter
+import numpy as np
 import pandas as pd
+from core.config import Config
 
 
 # =====================================================
@@ -9,11 +11,6 @@ class Strategies:
     def __init__(self, file_config="config.json"):
         self.load_config(file_config)
 
-    def load_config(self, path):
-        with open(path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            self.preset = config.get("preset", "basic")
-            
     PRESET = {
         "basic":     {"w_return": 1.0, "w_trades": 0.02, "w_sharpe": 0,    "w_drdown": 0},
         "balanced":  {"w_return": 1.0, "w_trades": 0.04, "w_sharpe": 0.01, "w_drdown": 0.05},
@@ -21,40 +18,112 @@ class Strategies:
         "defensive": {"w_return": 1.0, "w_trades": 0.05, "w_sharpe": 0,    "w_drdown": 0.05},
     }
             
-    def load_config(self, path):
-        with open(path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-            cfg    = config.get("backtest", {})
-        self.preset = cfg.get("preset", "basic")
+    METRICS = ["Return_Market", "Return_Strategy", "Trades", "Sharpe", "Max_Drawdown"]
+
+    def load_config(self, config):
+        # preset from the backtest section (top-level "preset" as fallback)
+        config = Config.load(config)
+        cfg = config.section("backtest")
+        self.preset  = cfg.get("preset", config.get("preset", "basic"))
+        self.top_k   = cfg.get("top_k", 0)         # ranked strategies kept per ticker (0 keeps all)
+        self.compare = cfg.get("compare", [])      # presets compared side by side
+        unknown = set(self.compare) -set(self.PRESET)
+        if unknown:
+            raise ValueError(f"Unsupported presets to compare: {sorted(unknown)}.")
     
-    def best_strategy(self, res_data, **weights):
+    def score(self, m, **weights):
+        # weighted objective score of the preset (higher is better), m: DataFrame or dict of arrays
+        params = {**self.PRESET[self.preset], **weights}
+        return (
+            params["w_return"]*m["Return_Strategy"]
+            -params["w_trades"]*m["Trades"]
+            +params["w_sharpe"]*m["Sharpe"]
+            -params["w_drdown"]*m["Max_Drawdown"]
+        )
+
+    @staticmethod
+    def table(res_data):
+        """
+        Results of every ticker and combination in one table, indexed by
+        (Ticker, Indicator, Parameters) with float64 metric columns.
+        Indicator and parameters are taken from the labels (ticker_indicator_params).
+        """
+        get     = itemgetter(*Strategies.METRICS)
+        tickers, indicators, params, values = [], [], [], []
+        for ticker, ticker_results in res_data.items():
+            keys = [label[len(ticker) +1:].partition("_") for label in ticker_results]
+            tickers    += [ticker]*len(keys)
+            indicators += [k[0] for k in keys]
+            params     += [k[2] for k in keys]
+            values     += map(get, ticker_results.values())
+        index = pd.MultiIndex.from_arrays([tickers, indicators, params], names=["Ticker", "Indicator", "Parameters"])
+        return pd.DataFrame(np.array(values, dtype=np.float64).reshape(-1, len(Strategies.METRICS)), index=index, columns=Strategies.METRICS)
+
+    def scores(self, table, presets=None, **weights):
+        # score of every row for each preset in one pass (one column per preset)
+        presets = presets or [self.preset]
+        W = pd.DataFrame([{**self.PRESET[p], **weights} for p in presets], index=presets)
+        R, T, S, D = (table[m].to_numpy()[:, None] for m in ("Return_Strategy", "Trades", "Sharpe", "Max_Drawdown"))
+        values = R*W["w_return"].to_numpy() -T*W["w_trades"].to_numpy() +S*W["w_sharpe"].to_numpy() -D*W["w_drdown"].to_numpy()
+        return pd.DataFrame(values, index=table.index, columns=presets)
+
+    @staticmethod
+    def top(score, k=0):
+        """
+        Positions of the k best scores (all when k is 0), best first, NaN last
+        and ties in their original order. Uses a partial sort when k is
+        smaller than the group.
+        """
+        key = np.where(np.isnan(score), np.inf, -score)
+        if 0 < k < len(key):
+            thr = key[np.argpartition(key, k -1)[k -1]]
+            idx = np.concatenate([np.flatnonzero(key < thr), np.flatnonzero(key == thr)])[:k]
+            idx.sort()
+        else:
+            idx = np.arange(len(key))
+        return idx[np.argsort(key[idx], kind="stable")]
+
+    def groups(self, table):
+        # row positions of each ticker (in the order of the table)
+        codes, tickers = pd.factorize(table.index.get_level_values("Ticker"))
+        order  = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) +1
+        return dict(zip(tickers, np.split(order, bounds)))
+
+    def best_strategy(self, res_data, k=None, **weights):
         """
         Manages scoring presets for strategy in a deterministic grid evaluation:
         tests all parameter combinations and ranks them using
-        weighted objective scores defined by each preset.
+        weighted objective scores defined by each preset. Only the top k
+        strategies of each ticker are kept (all when k is 0).
         """
+        k        = self.top_k if k is None else k
+        table    = self.table(res_data)
+        score    = self.scores(table, **weights).iloc[:, 0].to_numpy()
         bst_data = {}
-
-        params = {**self.PRESET[self.preset], **weights}
-        w_return = params["w_return"]
-        w_trades = params["w_trades"]
-        w_sharpe = params["w_sharpe"]
-        w_drdown = params["w_drdown"]
-        
-        
-        for ticker, ticker_results in res_data.items():
-            df = pd.DataFrame.from_dict(ticker_results, orient="index")
-            
-            # calculate SCORE (higher is better)
-            df["Score"] = (
-                w_return*df["Return_Strategy"]
-                -w_trades*df["Trades"]
-                +w_sharpe*df["Sharpe"]
-                -w_drdown*df["Max_Drawdown"]
-            )
-            bst_data[ticker] = df.sort_values("Score", ascending=False)
+        for ticker, pos in self.groups(table).items():
+            pos = pos[self.top(score[pos], k)]
+            df  = table.iloc[pos].reset_index()
+            df["Score"] = score[pos]
+            df.index = df["Ticker"] +"_" +df["Indicator"] +"_" +df["Parameters"]
+            df["Parameters"] = [[int(p) for p in params.split("_")] for params in df["Parameters"]]
+            bst_data[ticker] = df[["Indicator", "Parameters", *self.METRICS, "Score"]]
         return bst_data
-    
+
+    def compare_presets(self, res_data, presets=None):
+        # best strategy of each ticker under several presets (one row per ticker and preset)
+        presets = presets or self.compare or list(self.PRESET)
+        table   = self.table(res_data)
+        scores  = self.scores(table, presets)
+        rows    = []
+        for ticker, pos in self.groups(table).items():
+            for preset in presets:
+                j = pos[self.top(scores[preset].to_numpy()[pos], 1)[0]]
+                _, ind_t, params = table.index[j]
+                rows.append({"Ticker": ticker, "Preset": preset, "Label": f"{ticker}_{ind_t}_{params}", "Score": scores[preset].iloc[j],
+                             **table.iloc[j].to_dict()})
+        return pd.DataFrame(rows)
+
     def import_strategies(self, csv_file):
         # import strategies
         strategies = pd.read_csv(csv_file).set_index("Ticker").to_dict("index")
@@ -0,0 +1,104 @@
+import copy
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from core.config import Config
+from core.grid import GridBacktester
+from core.strategies import Strategies
+
+
+# =====================================================
+#  Walk-Forward
+# =====================================================
+class WalkForward:
+    """
+    Out-of-sample evaluation with rolling folds: on each train window the
+    combination with the best preset score is picked and then scored on the
+    following test window. Signals of every combination are computed once
+    over the whole series (grid engine) and only sliced per fold; folds run
+    in a thread pool, sharing the signal matrix.
+    """
+    def __init__(self, df, file_config="config.json", cache=None):
+        self.grid       = GridBacktester(df, file_config, cache)
+        self.strategies = Strategies(file_config)
+        self.dates      = df.index
+        self.n          = len(df)
+        self.load_config(file_config)
+
+    def load_config(self, config):
+        cfg = Config.load(config).section("walkforward")
+        self.train   = cfg.get("train", 250)            # bars of each train window
+        self.test    = cfg.get("test", 60)              # bars of each test window
+        self.step    = cfg.get("step", self.test)       # bars between folds
+        self.workers = cfg.get("workers", 1)
+        if self.train < 2 or self.test < 1 or self.step < 1:
+            raise ValueError("Walk-forward windows must have train >= 2, test >= 1 and step >= 1.")
+
+    def folds(self):
+        # (train, test) row ranges; the last test window may be shorter
+        return [((s, s +self.train), (s +self.train, min(s +self.train +self.test, self.n)))
+                for s in range(0, self.n -self.train, self.step)]
+
+    def window(self, S, start, end, warm=0):
+        """
+        Metrics of every combination over rows [start, end). With warm=2 the
+        two previous bars are simulated too, so the position carried into the
+        window comes from the signal known before it and a change of position
+        on the first bar of the window counts as a trade (with its costs);
+        metrics exclude the warm bars.
+        """
+        grid = copy.copy(self.grid)             # own result arrays, shared series
+        rows = slice(start -warm, end)
+        grid.execute(S[rows], rows)
+        m = grid.metrics(slice(warm, None))
+        m["Sharpe"] = np.nan_to_num(m["Sharpe"])  # no variance (e.g. out of the market the whole window)
+        return m
+
+    def fold(self, S, k, train, test):
+        m_train = self.window(S, *train)
+        score   = np.nan_to_num(self.strategies.score(m_train), nan=-np.inf)
+        j       = int(np.argmax(score))
+        m_test  = self.window(S, *test, warm=2)
+        return {
+            "Fold": k,
+            "Train_Start": self.dates[train[0]], "Train_End": self.dates[train[1] -1],
+            "Test_Start": self.dates[test[0]], "Test_End": self.dates[test[1] -1],
+            "Pick": j,
+            "Train_Score": float(score[j]),
+            "Return_Market": float(m_test["Return_Market"]),
+            **{key: float(m_test[key][j]) for key in ("Return_Strategy", "Trades", "Sharpe", "Max_Drawdown")},
+            "Score": float(self.strategies.score({key: m_test[key][j] for key in ("Return_Strategy", "Trades", "Sharpe", "Max_Drawdown")})),
+        }
+
+    def run(self, ticker, indicators):
+        """
+        Fold table of the ticker (one row per fold, the pick and its test
+        metrics) and the live pick: best combination on the most recent
+        train window.
+        """
+        S     = self.grid.signal_matrix(indicators)
+        folds = self.folds()
+        with ThreadPoolExecutor(max_workers=max(self.workers, 1)) as pool:
+            rows = list(pool.map(lambda f: self.fold(S, f[0], *f[1]), enumerate(folds)))
+
+        labels = [f"{ticker}_{ind['ind_t']}_{'_'.join(str(p) for p in ind['ind_p'])}" for ind in indicators]
+        for row in rows:
+            row["Label"] = labels[row.pop("Pick")]
+
+        live = None
+        if self.n >= self.train:
+            score = np.nan_to_num(self.strategies.score(self.window(S, self.n -self.train, self.n)), nan=-np.inf)
+            live  = labels[int(np.argmax(score))]
+        return rows, live
+
+    @staticmethod
+    def summary(rows):
+        # out-of-sample return (test windows compounded) against the market
+        if not rows:
+            return {"Folds": 0}
+        return {
+            "Folds": len(rows),
+            "Return_Strategy": float(np.prod([r["Return_Strategy"] for r in rows])),
+            "Return_Market": float(np.prod([r["Return_Market"] for r in rows])),
+            "Score_Mean": float(np.mean([r["Score"] for r in rows])),
+            "Picks": len({r["Label"] for r in rows}),
+        }
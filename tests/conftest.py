@@ -0,0 +1,4 @@
+import os, sys
+
+# repository root on the path (core package), as in benchmarks/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.kernels import Kernel
+
+
+def series(kind, n=300, seed=0):
+    # random walk closes, optionally with leading or interior missing values
+    x = 20*np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.02, n)))
+    if kind == "leading":
+        x[:7] = np.nan
+    elif kind == "interior":
+        x[[50, 51, 120, 200]] = np.nan
+    return x
+
+
+def wma_rolling(x, window):
+    # previous WMA implementation (rolling apply, linear weights 1..window)
+    w = pd.Series(range(1, window+1), dtype=float)
+    return pd.Series(x).rolling(window=window).apply(lambda v: (v*w).sum()/w.sum(), raw=True).to_numpy()
+
+
+KINDS   = ["plain", "leading", "interior"]
+WINDOWS = [1, 2, 5, 20, 60]
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_sma(kind, window):
+    x = series(kind)
+    np.testing.assert_allclose(Kernel.sma(x, window), pd.Series(x).rolling(window).mean().to_numpy(), rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_wma(kind, window):
+    x = series(kind)
+    np.testing.assert_allclose(Kernel.wma(x, window), wma_rolling(x, window), rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("window", [2, 5, 20, 60])
+def test_std(kind, window):
+    x = series(kind)
+    np.testing.assert_allclose(Kernel.std(x, window), pd.Series(x).rolling(window).std().to_numpy(), rtol=1e-8, equal_nan=True)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_ema(kind, window):
+    x = series(kind)
+    np.testing.assert_allclose(Kernel.ema(x, window), pd.Series(x).ewm(span=window, adjust=False).mean().to_numpy(), rtol=1e-10, equal_nan=True)
+
+
+def test_ema_continued():
+    # EMA over two chunks (state of the first chunk carried) equals the EMA of the whole series
+    x     = series("plain")
+    first = Kernel.ema(x[:100], 12)
+    np.testing.assert_allclose(np.concatenate([first, Kernel.ema(x[100:], 12, first[-1])]), Kernel.ema(x, 12), rtol=1e-12)
+
+
+@pytest.mark.parametrize("fn", [Kernel.sma, Kernel.wma, Kernel.std])
+def test_shorter_than_window(fn):
+    x   = series("plain", n=10)
+    out = fn(x, 20)
+    assert out.shape == x.shape and np.isnan(out).all()
+
+
+def test_ema_shorter_than_window():
+    # EMA has no warm-up: it is defined from the first value, as ewm(adjust=False)
+    x = series("plain", n=10)
+    np.testing.assert_allclose(Kernel.ema(x, 20), pd.Series(x).ewm(span=20, adjust=False).mean().to_numpy(), rtol=1e-12)
@@ -0,0 +1,165 @@
+import json, time, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from core.notifier import Notifier
+
+
+class Stub:
+    """
+    Local Telegram stub: answers each request with the next scripted
+    (status, body) response (200 with a message id when the script is over)
+    and records the path, payload and arrival time of every request.
+    """
+    def __init__(self):
+        self.script   = []
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append({"path": self.path, "payload": body, "time": time.monotonic()})
+                status, reply = stub.script.pop(0) if stub.script else (200, {"ok": True, "result": {"message_id": len(stub.requests)}})
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 64             # concurrent senders
+
+        self.server = Server(("127.0.0.1", 0), Handler)
+        self.url    = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    stub = Stub()
+    yield stub
+    stub.close()
+
+
+def notifier(stub, tmp_path, **cfg):
+    # notifier against the stub with fast settings (overridden by cfg)
+    settings = {"interval": 0.0, "per_minute": 1000, "retries": 2, "backoff": 0.01, "merge": False, "max_length": 4096, **cfg}
+    file = tmp_path/"config.json"
+    file.write_text(json.dumps({"notifier": settings}))
+    n = Notifier(str(file), base_url=stub.url)
+    n.TOKEN, n.CHAT_ID = "TEST", "@chat"
+    return n
+
+
+def test_send(stub, tmp_path):
+    n = notifier(stub, tmp_path)
+    assert n.send_telegram(n.message("hello")) == 1
+    assert stub.requests[0]["path"] == "/botTEST/sendMessage"
+    assert stub.requests[0]["payload"]["text"] == "hello"
+    assert n.stats()["sent"] == 1 and n.stats()["retries"] == 0 and n.stats()["dropped"] == 0
+
+
+def test_429_retry_after(stub, tmp_path):
+    # waits the retry_after of the response before the next attempt
+    stub.script = [(429, {"ok": False, "parameters": {"retry_after": 0.3}})]
+    n = notifier(stub, tmp_path)
+    n.send_telegram(n.message("hello"))
+    assert len(stub.requests) == 2
+    assert stub.requests[1]["time"] -stub.requests[0]["time"] >= 0.3
+    assert n.stats()["sent"] == 1 and n.stats()["retries"] == 1
+
+
+def test_retry_5xx(stub, tmp_path):
+    stub.script = [(500, {"ok": False}), (502, {"ok": False})]
+    n = notifier(stub, tmp_path)
+    assert n.send_telegram(n.message("hello")) == 3
+    assert n.stats()["retries"] == 2 and n.stats()["sent"] == 1 and n.stats()["dropped"] == 0
+
+
+def test_5xx_exhausted(stub, tmp_path):
+    # dropped after the last retry
+    stub.script = [(500, {"ok": False})]*3
+    n = notifier(stub, tmp_path)
+    with pytest.raises(requests.HTTPError):
+        n.send_telegram(n.message("hello"))
+    assert len(stub.requests) == 3
+    assert n.stats()["retries"] == 2 and n.stats()["dropped"] == 1 and n.stats()["sent"] == 0
+
+
+def test_no_retry_4xx(stub, tmp_path):
+    stub.script = [(400, {"ok": False, "description": "Bad Request"})]
+    n = notifier(stub, tmp_path)
+    with pytest.raises(requests.HTTPError):
+        n.send_telegram(n.message("hello"))
+    assert len(stub.requests) == 1
+    assert n.stats()["retries"] == 0 and n.stats()["dropped"] == 1
+
+
+def test_throttle_interval(stub, tmp_path):
+    # messages to the same chat are spaced by at least 'interval'
+    n = notifier(stub, tmp_path, interval=0.2)
+    for i in range(3):
+        n.send_telegram(n.message(f"msg {i}"))
+    times = [r["time"] for r in stub.requests]
+    assert all(b -a >= 0.19 for a, b in zip(times, times[1:]))
+
+
+def test_flush_merge(stub, tmp_path):
+    # consecutive texts are merged up to max_length, keys of a message share its id
+    n = notifier(stub, tmp_path, merge=True, max_length=25)
+    for key in ("A", "B", "C"):
+        n.enqueue(key, n.message(f"alert {key} 0123456"))      # 15 characters each
+    messages = n.flush()
+    assert len(stub.requests) == 3
+    assert messages == {"A": 1, "B": 2, "C": 3}
+
+    n = notifier(stub, tmp_path, merge=True, max_length=40)
+    for key in ("A", "B", "C"):
+        n.enqueue(key, n.message(f"alert {key} 0123456"))
+    messages = n.flush()
+    texts    = [r["payload"]["text"] for r in stub.requests[3:]]
+    assert texts == ["alert A 0123456\n\nalert B 0123456", "alert C 0123456"]
+    assert all(len(t) <= 40 for t in texts)
+    assert messages == {"A": 4, "B": 4, "C": 5}
+    assert n.queue == []
+
+
+def test_flush_without_merge(stub, tmp_path):
+    n = notifier(stub, tmp_path)
+    for key in ("A", "B"):
+        n.enqueue(key, n.message(f"alert {key}"))
+    assert n.flush() == {"A": 1, "B": 2}
+
+
+def test_stats(stub, tmp_path):
+    stub.script = [(500, {"ok": False}), (200, {"ok": True, "result": {"message_id": 7}}), (403, {"ok": False})]
+    n = notifier(stub, tmp_path)
+    n.enqueue("A", n.message("alert A"))
+    n.enqueue("B", n.message("alert B"))
+    assert n.flush() == {"A": 7}
+    stats = n.stats()
+    assert (stats["sent"], stats["retries"], stats["dropped"]) == (1, 1, 1)
+    assert 0 < stats["latency_mean"] <= stats["latency_max"]
+
+
+def test_stats_concurrent(stub, tmp_path):
+    # counters updated by several sender threads at once
+    stub.script = [(500, {"ok": False})]*10
+    n = notifier(stub, tmp_path, retries=10, backoff=0.0)
+    threads = [threading.Thread(target=lambda i=i: n.send_telegram(n.message(f"msg {i}"))) for i in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = n.stats()
+    assert stats["sent"] == 40 and stats["dropped"] == 0
+    assert len(n.latency) == len(stub.requests) == stats["sent"] +stats["retries"] == 50
@@ -0,0 +1,121 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from core.loader import Loader
+from core.store import Store
+
+
+def write_source(path, ticker, end="2024-12-31", seed=0, scale=1.0):
+    # daily closes and volumes of a ticker in a FileProvider folder
+    idx = pd.bdate_range("2024-01-01", end, name="Date")
+    rng = np.random.default_rng(seed)
+    df  = pd.DataFrame({"Close": scale*20*np.exp(np.cumsum(rng.normal(0, 0.02, len(idx)))),
+                        "Volume": rng.integers(1e5, 1e6, len(idx)).astype(float)}, index=idx)
+    df.to_csv(path/f"{ticker}.SA.csv")
+    return df
+
+
+def loader(tmp_path, end, **data):
+    # Loader over the file provider with the store enabled (config in tmp_path)
+    settings = {"provider": "file", "source": str(tmp_path/"source"), "store": True, "path": str(tmp_path/"store"), **data}
+    file = tmp_path/f"config_{end}.json"
+    file.write_text(json.dumps({"start": "2024-01-01", "end": end, "data": settings}))
+    return Loader(str(file))
+
+
+@pytest.fixture
+def source(tmp_path):
+    (tmp_path/"source").mkdir()
+    return tmp_path/"source"
+
+
+def test_first_fetch(tmp_path, source):
+    full = write_source(source, "PETR4")
+    l    = loader(tmp_path, "2024-07-01")
+    df   = l.download_data("PETR4")
+    assert l.provider.calls == 1
+    pd.testing.assert_frame_equal(df, full[full.index < "2024-07-01"], check_freq=False)
+    assert l.store.missing("PETR4", "2024-01-01", "2024-07-01") == []
+
+
+def test_incremental_fetch(tmp_path, source):
+    full = write_source(source, "PETR4")
+    loader(tmp_path, "2024-07-01").download_data("PETR4")
+
+    # only the new bars are requested (from the bar before the last stored one)
+    l  = loader(tmp_path, "2024-08-01")
+    ranges = l.store.missing("PETR4", l.start, l.end)
+    assert ranges == [(pd.Timestamp("2024-06-27"), pd.Timestamp("2024-08-01"))]
+    df = l.download_data("PETR4")
+    assert l.provider.calls == 1
+    pd.testing.assert_frame_equal(df, full[full.index < "2024-08-01"], check_freq=False)
+
+    # nothing to fetch when the range is already covered
+    l = loader(tmp_path, "2024-08-01")
+    l.download_data("PETR4")
+    assert l.provider.calls == 0
+
+
+def test_earlier_start(tmp_path, source):
+    write_source(source, "PETR4")
+    store = Store(str(tmp_path/"store"))
+    store.append("PETR4", pd.DataFrame({"Close": [1.0, 2.0], "Volume": [1.0, 1.0]}, index=pd.DatetimeIndex(["2024-03-01", "2024-03-04"])), "2024-03-01", "2024-03-05")
+    assert store.missing("PETR4", "2024-01-01", "2024-03-05") == [(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-01"))]
+
+
+def test_revised_history(tmp_path, source):
+    # adjusted prices (e.g. after a split) make the store fetch the whole history again
+    write_source(source, "PETR4")
+    loader(tmp_path, "2024-07-01").download_data("PETR4")
+    full = write_source(source, "PETR4", scale=0.5)
+    l    = loader(tmp_path, "2024-08-01")
+    df   = l.download_data("PETR4")
+    assert l.provider.calls == 2
+    pd.testing.assert_frame_equal(df, full[full.index < "2024-08-01"], check_freq=False)
+
+
+def test_last_bar_updated(tmp_path, source):
+    # a partial last bar is replaced by the final one without a full refetch
+    full = write_source(source, "PETR4")
+    loader(tmp_path, "2024-07-01").download_data("PETR4")
+    store = Store(str(tmp_path/"store"))
+    df    = store.load("PETR4")
+    df.iloc[-1, df.columns.get_loc("Close")] *= 1.01
+    df.to_parquet(store.file("PETR4"))
+
+    l = loader(tmp_path, "2024-08-01")
+    pd.testing.assert_frame_equal(l.download_data("PETR4"), full[full.index < "2024-08-01"], check_freq=False)
+    assert l.provider.calls == 1
+
+
+def test_download_many(tmp_path, source):
+    full = {t: write_source(source, t, seed=i) for i, t in enumerate(("PETR4", "VALE3"))}
+    loader(tmp_path, "2024-07-01").download_many(["PETR4", "VALE3"])
+    full["VALE3"] = write_source(source, "VALE3", seed=1, scale=2.0)
+
+    data, errors = loader(tmp_path, "2024-08-01").download_many(["PETR4", "VALE3", "ITUB4"])
+    assert list(errors) == ["ITUB4"]
+    for t in ("PETR4", "VALE3"):
+        pd.testing.assert_frame_equal(data[t], full[t][full[t].index < "2024-08-01"], check_freq=False)
+
+
+def test_atomic_write(tmp_path, source, monkeypatch):
+    # a failed write leaves the stored bars and range untouched
+    write_source(source, "PETR4")
+    loader(tmp_path, "2024-07-01").download_data("PETR4")
+    store  = Store(str(tmp_path/"store"))
+    before = store.load("PETR4"), store.load_meta("PETR4")
+
+    def broken(self, path, *args, **kwargs):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", broken)
+    with pytest.raises(RuntimeError):
+        loader(tmp_path, "2024-08-01").download_data("PETR4")
+    monkeypatch.undo()
+
+    pd.testing.assert_frame_equal(store.load("PETR4"), before[0])
+    assert store.load_meta("PETR4") == before[1]